@@ -1,7 +1,7 @@
 import minescript as m
 import sys
-import time
 import system.lib.minescript
+from minescript_plus import Macro
 
 
 TNTslot = 0
@@ -27,28 +27,16 @@ yP=0.5
 
 
 
-m.player_press_use(True)
-
-
-X = 0 
-Y = 50
-m.player_set_orientation(X,Y)
-time.sleep(0.2)
-X+=90
-m.player_set_orientation(X,Y)
-time.sleep(0.2)
-X+=90
-m.player_set_orientation(X,Y)
-time.sleep(0.2)
-X+=90
-Y+=10
-m.player_set_orientation(X,Y)
-time.sleep(0.2)
-m.player_look_at(x,y-1,z)
-
-m.player_inventory_select_slot(PPslot)
-time.sleep(0.2)
-m.player_press_use(False)
-m.player_press_jump(True)
-time.sleep(16)
-m.player_press_jump(False)
\ No newline at end of file
+# 4 ticks = 0.2 s, 320 ticks = 16 s
+(Macro()
+    .use(True)
+    .orientation(0, 50).wait(4)
+    .orientation(90, 50).wait(4)
+    .orientation(180, 50).wait(4)
+    .orientation(270, 60).wait(4)
+    .look_at(x, y - 1, z)
+    .select_slot(PPslot).wait(4)
+    .use(False)
+    .key_bind("key.jump", True).wait(320)
+    .key_bind("key.jump", False)
+    .play())
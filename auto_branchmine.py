@@ -1,8 +1,7 @@
 ####NOT READY
 import minescript as m
 import sys
-import time
-from minescript_plus import Client,Gui
+from minescript_plus import Client,Gui,KeyState,CancelToken
 import ready4mining
 import lib_centre_player
 
@@ -11,55 +10,60 @@ import lib_centre_player
 # CENTRE_PLAYER.center_player() #has autism - not reccomended to run
 #NOW START THE LOOP
 
-while True:
-    #check player pos   
-    px = m.player_position()[0] #p stands for previous
-    pz = m.player_position()[2]
-    pz, px = int(pz), int(px)
+keys = KeyState.get() # releases every held key when the script stops
+token = CancelToken().cancel_on_chat("stop") # type "stop" in chat to stop mining
+token.on_cancel(keys.release_all)
 
-    #set  to pitch 25 and forward+attack                 #   straight mining
-    ready4mining.ready()
-    m.press_key_bind("key.forward",True)
-    m.press_key_bind("key.attack",True)
+with token:
+    while True:
+        #check player pos   
+        px = m.player_position()[0] #p stands for previous
+        pz = m.player_position()[2]
+        pz, px = int(pz), int(px)
 
+        #set  to pitch 25 and forward+attack                 #   straight mining
+        ready4mining.ready()
+        keys.press("key.forward")
+        keys.press("key.attack")
 
 
-                                    #         
 
+                                        #         
 
 
 
-    #when travelled 4 blocks{                            #      
-    while abs(int(m.player_position()[0]) - px) < 4 and abs(int(m.player_position()[2]) - pz) < 4:
-        # print("not yet")
-        time.sleep(2)
 
-    # while True:
-    # print("DONE")
-    m.press_key_bind("key.forward",False)
-    m.press_key_bind("key.attack",False)
+        #when travelled 4 blocks{                            #      
+        while abs(int(m.player_position()[0]) - px) < 4 and abs(int(m.player_position()[2]) - pz) < 4:
+            # print("not yet")
+            token.wait_ticks(4)
 
-    #set pitch to 0 and change yaw by 90 degrees                        #
-    yaw,pitch = m.player_orientation()
-    yaw, pitch = int(yaw), int(pitch)
-    m.player_set_orientation((yaw+90),0)
+        # while True:
+        # print("DONE")
+        keys.release("key.forward")
+        keys.release("key.attack")
 
-    #mine 5 blocks                                                      #
-    m.press_key_bind("key.attack",True)
-    time.sleep(1.2)
-    m.press_key_bind("key.attack",False)
-    #change yaw by 180 degrees                                          # MAKE BRANCHES
-    yaw,pitch = m.player_orientation()
-    yaw, pitch = int(yaw), int(pitch)
-    m.player_set_orientation((yaw-180),0)
+        #set pitch to 0 and change yaw by 90 degrees                        #
+        yaw,pitch = m.player_orientation()
+        yaw, pitch = int(yaw), int(pitch)
+        m.player_set_orientation((yaw+90),0)
 
-    #mine 5 blocks                                                      #
-    m.press_key_bind("key.attack",True)
-    time.sleep(1.2)
-    m.press_key_bind("key.attack",False)
-    #change yaw by 90 degrees}                                          #
-    yaw,pitch = m.player_orientation()
-    yaw, pitch = int(yaw), int(pitch)
-    m.player_set_orientation((yaw+90),0)
+        #mine 5 blocks                                                      #
+        keys.press("key.attack")
+        token.wait_ticks(24)
+        keys.release("key.attack")
+        #change yaw by 180 degrees                                          # MAKE BRANCHES
+        yaw,pitch = m.player_orientation()
+        yaw, pitch = int(yaw), int(pitch)
+        m.player_set_orientation((yaw-180),0)
 
-    #REPEAT
\ No newline at end of file
+        #mine 5 blocks                                                      #
+        keys.press("key.attack")
+        token.wait_ticks(24)
+        keys.release("key.attack")
+        #change yaw by 90 degrees}                                          #
+        yaw,pitch = m.player_orientation()
+        yaw, pitch = int(yaw), int(pitch)
+        m.player_set_orientation((yaw+90),0)
+
+        #REPEAT
\ No newline at end of file
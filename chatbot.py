@@ -112,6 +112,24 @@ def distance_squared(pos1: BlockPos, pos2: BlockPos) -> float:
   return (pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2 + (pos1[2] - pos2[2]) ** 2
 
 
+# Top-level entity NBT keys that query() reads.
+ENTITY_NBT_KEYS = ("OnGround", "Sleeping", "Sitting", "FallDistance", "variant")
+
+
+def read_top_level_values(snbt: str, keys: Tuple[str, ...]) -> Dict[str, Any]:
+  """Reads the top-level values for `keys` from SNBT without building the whole tree.
+
+  Stops reading as soon as all keys are found.
+  """
+  values = {}
+  for path, event, value in lib_nbt.iterparse(snbt):
+    if event == "value" and len(path) == 1 and path[0] in keys:
+      values[path[0]] = value
+      if len(values) == len(keys):
+        break
+  return values
+
+
 def query(question: str, debug: bool = False) -> str:
   context = (
     "me: This is tab-delimited tabular data representing Minecraft entity's name, " +
@@ -149,8 +167,8 @@ def query(question: str, debug: bool = False) -> str:
 
   for i, entity in enumerate(entities):
     me: bool = entity.get("local") or False
-    snbt = entity.get("nbt")
-    nbt = lib_nbt.parse_snbt(snbt) if snbt else {}
+    snbt = entity.pop("nbt", None)  # Drop each blob once read
+    nbt = read_top_level_values(snbt, ENTITY_NBT_KEYS) if snbt else {}
     name = entity["name"]
     #name = json.loads(nbt.get("CustomName", "{}")).get("text") or entity["name"]
     if me:
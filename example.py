@@ -1,4 +1,6 @@
 from minescript import (echo, execute, getblock, player)
+from lib_nbt import to_snbt
+import json
 import sys
 
 # Get the player's position, rounded to the nearest integer:
@@ -8,9 +10,14 @@ x, y, z = [round(p) for p in player().position]
 block_type = getblock(x, y - 1, z)
 block_type = block_type.replace("minecraft:", "").split("[")[0]
 
-sign_text = (
-    """{Text1:'{"text":"%s"}',Text2:'{"text":"at"}',Text3:'{"text":"%d %d %d"}'}""" %
-    (block_type, x, y - 1, z))
+def text_component(text):
+  return json.dumps({"text": text}, separators=(",", ":"))
+
+sign_text = to_snbt({
+    "Text1": text_component(block_type),
+    "Text2": text_component("at"),
+    "Text3": text_component(f"{x} {y - 1} {z}"),
+})
 
 # Script argument, passed from Minecraft like "example 5"
 rotation = int(sys.argv[1]) if len(sys.argv) > 1 else 0
@@ -4,9 +4,14 @@ import pyautogui
 # import time
 # import system.lib.minescript
 # from minescript_plus import Client,World,Gui
+from minescript_plus import RateGovernor
 
 
+governor = RateGovernor.get()
+governor.limit("swap_drop", per_tick=1)
+
 while True:
+    governor.acquire("swap_drop")
     m.press_key_bind("key.swapOffhand",True)
     m.press_key_bind("key.drop",True)
 
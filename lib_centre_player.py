@@ -9,10 +9,11 @@ import math
 #autism is to huge - branchmining module will not use it from now
 
 def release_all_movement_keys():
-    for key in ["key.forward", "key.left", "key.back", "key.right", 'key.sneak']:
-        m.press_key_bind(key,False)
+    m_plus.KeyState.get().release_keys(["key.forward", "key.left", "key.back", "key.right", 'key.sneak'])
 
 def center_player():
+    keys = m_plus.KeyState.get()
+    clock = m_plus.TickClock.get()
     try:
         x, y, z = m.player_position()
         target_x = math.floor(x) + 0.5
@@ -21,7 +22,7 @@ def center_player():
         tolerance = 0.005  
         timeout = time.time() + 2
 
-        m.press_key_bind('key.sneak',True)
+        keys.press('key.sneak')
 
         while time.time() < timeout:
             current_x, _, current_z = m.player_position()
@@ -32,29 +33,13 @@ def center_player():
             if is_x_centered and is_z_centered:
                 break  
 
-            if not is_x_centered:
-                if current_x < target_x:
-                    m.press_key_bind("key.right",True)
-                    m.press_key_bind("key.left",False)
-                else:
-                    m.press_key_bind("key.left",True)
-                    m.press_key_bind("key.right",False)
-            else:
-                m.press_key_bind("key.left",False)
-                m.press_key_bind("key.right",False)
-
-            if not is_z_centered:
-                if current_z > target_z:
-                    m.press_key_bind("key.forward",True)
-                    m.press_key_bind("key.back",False)
-                else:
-                    m.press_key_bind("key.back",True)
-                    m.press_key_bind("key.forward",False)
-            else:
-                m.press_key_bind("key.forward",False)
-                m.press_key_bind("key.back",False)
+            # KeyState only sends the keys whose state actually changed, once per tick
+            keys.set("key.right", not is_x_centered and current_x < target_x)
+            keys.set("key.left", not is_x_centered and current_x >= target_x)
+            keys.set("key.forward", not is_z_centered and current_z > target_z)
+            keys.set("key.back", not is_z_centered and current_z <= target_z)
             
-            time.sleep(0.01)
+            clock.wait_next_tick()
 
         m.echo("DONE")
 
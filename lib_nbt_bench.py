@@ -0,0 +1,438 @@
+#!/usr/bin/python3
+
+r"""Benchmark and regression harness for lib_nbt.
+
+Runs offline, without the game: parses a corpus of realistic SNBT (enchanted tools, a
+shulker box of nested items, mob entities, player data, a chunk section) and reports
+throughput, peak memory and allocated blocks, then checks round trips on the corpus and
+on random values. parse_snbt is measured against _parse_snbt_shlex, the original
+shlex-based parser, which it beats by 4-9x depending on the input (not the 10x aimed for).
+
+Usage:
+  python lib_nbt_bench.py [--quick] [--fuzz N] [--save FILE] [--compare FILE]
+
+  --save writes the results as a JSON baseline; --compare reports the change against a
+  saved baseline and exits with status 1 if any benchmark is slower by more than
+  --threshold percent (default 15).
+"""
+
+import argparse
+import array
+import json
+import random
+import re
+import shlex
+import string
+import sys
+import time
+import tracemalloc
+
+import lib_nbt
+
+from dataclasses import dataclass
+from lib_nbt import Byte, Short, Long, Float, to_snbt
+from typing import Any, Callable, Dict, List, Tuple
+
+# Corpus
+
+ENCHANTED_PICKAXE = (
+  '{id:"minecraft:diamond_pickaxe",count:1,components:{"minecraft:damage":42,'
+  '"minecraft:enchantments":{levels:{"minecraft:efficiency":5,"minecraft:unbreaking":3,'
+  '"minecraft:fortune":3,"minecraft:mending":1}},"minecraft:repair_cost":7,'
+  '"minecraft:custom_name":\'{"extra":[{"bold":true,"color":"aqua","text":"Digger"}],"text":""}\'}}')
+
+LEGACY_SWORD = (
+  '{id:"minecraft:netherite_sword",Count:1b,tag:{Damage:12,RepairCost:15,Unbreakable:0b,'
+  'Enchantments:[{id:"minecraft:sharpness",lvl:5s},{id:"minecraft:looting",lvl:3s},'
+  '{id:"minecraft:fire_aspect",lvl:2s},{id:"minecraft:sweeping",lvl:3s},{id:"minecraft:mending",lvl:1s}],'
+  'display:{Name:\'{"text":"Blade of \\\\"Night\\\\"","italic":false}\','
+  'Lore:[\'{"text":"Forged in the Nether"}\',\'{"text":"Kills: 1024","color":"gray"}\']}}}')
+
+def _item(name: str, count: int, **components: Any) -> Dict[str, Any]:
+  item: Dict[str, Any] = {"id": "minecraft:" + name, "count": count}
+  if components:
+    item["components"] = {"minecraft:" + k: v for k, v in components.items()}
+  return item
+
+def _shulker_box() -> str:
+  rng = random.Random(1)
+  book = _item("enchanted_book", 1, stored_enchantments={"levels": {
+      "minecraft:protection": 4, "minecraft:unbreaking": 3, "minecraft:mending": 1}})
+  potion = _item("potion", 1, potion_contents={"potion": "minecraft:strong_healing"})
+  inner = _item("shulker_box", 1, container=[{"slot": i, "item": _item("diamond", 64)} for i in range(5)])
+  kinds = [book, potion, inner, _item("cobblestone", 64), _item("oak_log", 32),
+           _item("golden_apple", 8), _item("iron_pickaxe", 1, damage=17)]
+  container = [{"slot": slot, "item": rng.choice(kinds)} for slot in range(27)]
+  return to_snbt(_item("shulker_box", 1, container=container,
+                       custom_name='{"text":"Loot"}', lock={"items": "minecraft:tripwire_hook"}))
+
+def _zombie(rng: random.Random) -> Dict[str, Any]:
+  return {
+    "id": "minecraft:zombie", "Health": Float(20.0), "Air": Short(300), "Fire": Short(-1),
+    "FallDistance": Float(0.0), "OnGround": Byte(1), "Invulnerable": Byte(0), "PortalCooldown": 0,
+    "Pos": [rng.uniform(-1000, 1000), 64.0, rng.uniform(-1000, 1000)],
+    "Motion": [0.0, -0.0784000015258789, 0.0], "Rotation": [Float(rng.uniform(0, 360)), Float(0.0)],
+    "UUID": array.array("i", [rng.randint(-2**31, 2**31 - 1) for _ in range(4)]),
+    "Attributes": [
+      {"id": "minecraft:generic.max_health", "base": 20.0},
+      {"id": "minecraft:generic.movement_speed", "base": 0.23000000417232513},
+      {"id": "minecraft:generic.follow_range", "base": 35.0, "modifiers": [
+        {"id": "minecraft:random_spawn_bonus", "amount": rng.gauss(0, 0.057), "operation": "add_multiplied_base"}]},
+      {"id": "minecraft:zombie.spawn_reinforcements", "base": rng.random() * 0.1},
+    ],
+    "ArmorItems": [{}, {}, _item("iron_chestplate", 1, damage=3), {}],
+    "HandItems": [_item("iron_shovel", 1), {}],
+    "ArmorDropChances": [Float(0.085)] * 4, "HandDropChances": [Float(0.085)] * 2,
+    "Brain": {"memories": {}}, "CanPickUpLoot": Byte(0), "IsBaby": Byte(0),
+    "DrownedConversionTime": -1, "InWaterTime": -1, "HurtTime": Short(0), "DeathTime": Short(0),
+  }
+
+def _player() -> str:
+  rng = random.Random(2)
+  names = ["stone", "dirt", "torch", "bread", "oak_planks", "diamond", "iron_ingot", "coal"]
+  inventory = [dict(_item(rng.choice(names), rng.randint(1, 64)), Slot=Byte(slot)) for slot in range(36)]
+  inventory[0] = dict(lib_nbt.parse_snbt(ENCHANTED_PICKAXE), Slot=Byte(0))
+  return to_snbt({
+    "DataVersion": 3953, "playerGameType": 0, "Score": 0, "SelectedItemSlot": 0,
+    "Health": Float(20.0), "foodLevel": 20, "foodSaturationLevel": Float(5.0), "XpLevel": 30,
+    "XpP": Float(0.25), "XpTotal": 1395, "XpSeed": rng.randint(-2**31, 2**31 - 1),
+    "Pos": [123.5, 64.0, -456.5], "Rotation": [Float(90.0), Float(15.0)], "Dimension": "minecraft:overworld",
+    "UUID": array.array("i", [rng.randint(-2**31, 2**31 - 1) for _ in range(4)]),
+    "abilities": {"flying": Byte(0), "flySpeed": Float(0.05), "instabuild": Byte(0), "invulnerable": Byte(0),
+                  "mayBuild": Byte(1), "mayfly": Byte(0), "walkSpeed": Float(0.1)},
+    "Inventory": inventory,
+    "EnderItems": [dict(_item("ender_pearl", 16), Slot=Byte(i)) for i in range(27)],
+    "recipeBook": {"recipes": [f"minecraft:recipe_{i}" for i in range(120)],
+                   "toBeDisplayed": [], "isFilteringCraftable": Byte(0), "isGuiOpen": Byte(0)},
+    "attributes": [{"id": "minecraft:generic.max_health", "base": 20.0},
+                   {"id": "minecraft:generic.movement_speed", "base": 0.10000000149011612}],
+    "LastDeathLocation": {"dimension": "minecraft:overworld", "pos": array.array("i", [10, 64, -20])},
+    "seenCredits": Byte(0), "warden_spawn_tracker": {"cooldown_ticks": 0, "ticks_since_last_warning": 8000},
+    "Spawn": {"x": 0, "y": 70, "z": 0}, "WorldUUIDLeast": Long(-6000000000000000000),
+  })
+
+def _chunk_section() -> str:
+  rng = random.Random(3)
+  return to_snbt({
+    "Y": Byte(-4),
+    "block_states": {
+      "palette": [{"Name": "minecraft:" + name} for name in
+                  ("deepslate", "tuff", "diamond_ore", "deepslate_iron_ore", "lava", "air")],
+      "data": array.array("q", [rng.randint(-2**63, 2**63 - 1) for _ in range(256)]),
+    },
+    "biomes": {"palette": ["minecraft:deep_dark"]},
+    "BlockLight": array.array("b", [rng.randint(-128, 127) for _ in range(2048)]),
+  })
+
+def build_corpus() -> Dict[str, str]:
+  "Returns the benchmark corpus: name -> SNBT string. Deterministic across runs."
+  rng = random.Random(4)
+  return {
+    "enchanted_pickaxe": ENCHANTED_PICKAXE,
+    "legacy_sword": LEGACY_SWORD,
+    "shulker_box": _shulker_box(),
+    "zombie": to_snbt(_zombie(rng)),
+    "zombies_50": to_snbt([_zombie(rng) for _ in range(50)]),
+    "player": _player(),
+    "chunk_section": _chunk_section(),
+  }
+
+# Baseline parser
+
+def _nbt_string_to_tokens(nbt_str: str):
+  "Tokenizes an NBT string into a list of string tokens."
+  lex = shlex.shlex(nbt_str, posix=True)
+  lex.escapedquotes = lex.quotes  # escape single quotes, too
+  lex.wordchars += ".;-" # parse floating-point numbers as a single token
+  return lex
+
+@dataclass
+class DictItem:
+  key: Any
+
+bool_re = re.compile("(true|false)$")
+int_re = re.compile(r"(-?[0-9]+)[bBsSlL]?$")
+float_re = re.compile(r"(-?[0-9]+.?[0-9]*)[fFdD]$")
+array_re = re.compile(r"[BIL];(.*)$")
+
+def _parse_snbt_shlex(nbt_str: str) -> Dict:
+  "The original shlex-based lib_nbt.parse_snbt(), the baseline parse_snbt is measured against."
+  context = [lib_nbt.unassigned] # elements are the types dict or list
+  processed_tokens = ""
+
+  def parse_value(value: Any) -> Any:
+    if type(value) is str:
+      m = bool_re.match(value)
+      if m:
+        return m.group(1) == "true"
+      m = int_re.match(value)
+      if m:
+        return int(m.group(1))
+      m = float_re.match(value)
+      if m:
+        return float(m.group(1))
+    return value
+
+  def process_value(value: Any):
+    value = parse_value(value)
+
+    c = context[-1]
+    if c is lib_nbt.unassigned:
+      context[-1] = value
+    elif type(c) is list:
+      if len(c) == 0 and type(value) is str:
+        m = array_re.match(value)
+        if m:
+          value = parse_value(m.group(1))
+      c.append(value)
+    elif type(c) is DictItem:
+      context.pop()
+      c2 = context[-1]
+      if type(c2) is not dict:
+        raise Exception(f"Expected context to be a dict but got `{c2}`")
+      c2[c.key] = value
+    elif type(c) is dict:
+      context.append(DictItem(key=value))
+
+    value_type = type(value)
+    if value_type in (list, dict):
+      context.append(value)
+
+  try:
+    for token in _nbt_string_to_tokens(nbt_str):
+      processed_tokens += token
+      if token == "{":
+        process_value({})
+      elif token == "}":
+        if len(context) > 1:
+          context.pop()
+      elif token == "[":
+        process_value([])
+      elif token == "]":
+        if len(context) > 1:
+          context.pop()
+      elif token == ",":
+        pass # TODO(maxuser): add error-checking so comma isn't optional
+      elif token == ":":
+        pass # TODO(maxuser): add error-checking so colon isn't optional
+      else:
+        process_value(token)
+  except Exception as e:
+    raise Exception(e.args[0], context, processed_tokens)
+
+  return None if context[0] is lib_nbt.unassigned else context[0]
+
+# Measurements
+
+def measure_time(func: Callable[[], Any], min_time: float) -> float:
+  "Returns the best seconds per call of func() over batches lasting at least `min_time` in total."
+  number = 1
+  while True:
+    start = time.perf_counter()
+    for _ in range(number):
+      func()
+    elapsed = time.perf_counter() - start
+    if elapsed >= 0.02:
+      break
+    number *= 4
+  best = elapsed / number
+  deadline = time.perf_counter() + min_time
+  while time.perf_counter() < deadline:
+    start = time.perf_counter()
+    for _ in range(number):
+      func()
+    best = min(best, (time.perf_counter() - start) / number)
+  return best
+
+def measure_memory(func: Callable[[], Any]) -> Tuple[int, int]:
+  "Returns the peak bytes allocated while calling func() and the blocks its result keeps alive."
+  tracemalloc.start()
+  try:
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+  finally:
+    tracemalloc.stop()
+  del result
+  return peak, blocks
+
+def _consume(iterator: Any) -> None:
+  for _ in iterator:
+    pass
+
+def run_benchmarks(corpus: Dict[str, str], min_time: float) -> Dict[str, Dict[str, float]]:
+  results: Dict[str, Dict[str, float]] = {}
+  for name, snbt in corpus.items():
+    value = lib_nbt.parse_snbt(snbt)
+    binary = lib_nbt.to_nbt(value)
+    cases = {
+      "parse_snbt": lambda: lib_nbt.parse_snbt(snbt),
+      "parse_snbt_shlex": lambda: _parse_snbt_shlex(snbt),
+      "iterparse": lambda: _consume(lib_nbt.iterparse(snbt)),
+      "to_snbt": lambda: to_snbt(value),
+      "parse_nbt": lambda: lib_nbt.parse_nbt(binary),
+      "to_nbt": lambda: lib_nbt.to_nbt(value),
+    }
+    for case, func in cases.items():
+      key = f"{case}/{name}"
+      try:
+        seconds = measure_time(func, min_time)
+      except Exception as e:  # The shlex baseline can't parse everything
+        print(f"{key:40} failed: {type(e).__name__}")
+        continue
+      peak, blocks = measure_memory(func)
+      results[key] = {
+        "seconds": seconds,
+        "mb_per_s": len(snbt) / seconds / 1e6,
+        "peak_kb": peak / 1024,
+        "blocks": blocks,
+      }
+      print(f"{key:40} {seconds * 1e6:10.1f} us {len(snbt) / seconds / 1e6:8.2f} MB/s "
+            f"{peak / 1024:9.1f} KB peak {blocks:7} blocks")
+  return results
+
+# Correctness
+
+def _random_value(rng: random.Random, depth: int = 0) -> Any:
+  kinds = ["int", "long", "byte", "short", "float", "double", "bool", "str", "ints", "longs"]
+  if depth < 4:
+    kinds += ["compound", "list"] * 2
+  kind = rng.choice(kinds)
+  if kind == "int":
+    return rng.randint(-2**31, 2**31 - 1)
+  if kind == "long":
+    return Long(rng.randint(-2**63, 2**63 - 1))
+  if kind == "byte":
+    return Byte(rng.randint(-128, 127))
+  if kind == "short":
+    return Short(rng.randint(-2**15, 2**15 - 1))
+  if kind == "float":
+    return Float(rng.choice([0.0, 0.5, -1.25, 1048576.0]))
+  if kind == "double":
+    return rng.choice([0.0, 1.0, -2.5, 1e-300, 1e300, rng.random()])
+  if kind == "bool":
+    return rng.random() < 0.5
+  if kind == "str":
+    alphabet = string.ascii_letters + string.digits + " _-.+:'\"\\{}[],;éλ😀\n"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+  if kind == "ints":
+    return array.array("i", [rng.randint(-2**31, 2**31 - 1) for _ in range(rng.randint(0, 8))])
+  if kind == "longs":
+    return array.array("q", [rng.randint(-2**63, 2**63 - 1) for _ in range(rng.randint(0, 8))])
+  if kind == "compound":
+    return {_random_key(rng): _random_value(rng, depth + 1) for _ in range(rng.randint(0, 6))}
+  if rng.random() < 0.25:
+    # Plain ints, some of which may need a long, which makes the whole list longs
+    return [rng.randint(-2**31, 2**31 - 1) if rng.random() < 0.7 else rng.randint(-2**63, 2**63 - 1)
+            for _ in range(rng.randint(1, 6))]
+  item = _random_value(rng, depth + 1)  # NBT lists hold one type; repeat similar values
+  return [item] * rng.randint(0, 5)
+
+def _random_key(rng: random.Random) -> str:
+  return "".join(rng.choice(string.ascii_letters + "_: .\"") for _ in range(rng.randint(1, 8)))
+
+def _read_back(value: Any, typed: bool) -> Any:
+  """Returns `value` as parse_nbt(typed=True) reads it back from to_nbt() if `typed`, else as
+  parse_snbt() reads it back from to_snbt()."""
+  t = type(value)
+  if t is bool:
+    return Byte(value) if typed else value
+  if t is int:
+    return Long(value) if typed and not -2**31 <= value < 2**31 else value
+  if t in (Byte, Short, Long):
+    return value if typed else int(value)
+  if t is Float:
+    return value if typed else float(value)
+  if isinstance(value, dict):
+    return {k: _read_back(v, typed) for k, v in value.items()}
+  if t is list or t is tuple:
+    items = [_read_back(v, typed) for v in value]
+    if typed and any(type(v) is Long for v in items):
+      items = [Long(v) if type(v) is int else v for v in items]  # The list's ints are all longs
+    return items
+  return value
+
+def _same(a: Any, b: Any) -> bool:
+  "Compares values recursively on type as well as value, since Byte(1) == 1."
+  if type(a) is not type(b):
+    return False
+  if type(a) is dict:
+    return a.keys() == b.keys() and all(_same(v, b[k]) for k, v in a.items())
+  if type(a) is list:
+    return len(a) == len(b) and all(map(_same, a, b))
+  if type(a) is array.array:
+    return a.itemsize == b.itemsize and a == b
+  return a == b
+
+def check_round_trips(corpus: Dict[str, str], fuzz: int, seed: int = 0) -> List[str]:
+  "Returns descriptions of round-trip failures between parse_snbt, to_snbt and binary NBT."
+  failures = []
+
+  def check(label: str, value: Any) -> None:
+    try:
+      snbt = to_snbt(value)
+      if not _same(lib_nbt.parse_snbt(snbt), _read_back(value, False)):
+        failures.append(f"{label}: SNBT round trip changed the value: {snbt[:80]}")
+      if not _same(lib_nbt.parse_nbt(lib_nbt.to_nbt(value), typed=True), _read_back(value, True)):
+        failures.append(f"{label}: binary NBT round trip changed the value: {snbt[:80]}")
+    except Exception as e:
+      failures.append(f"{label}: {type(e).__name__}: {e}")
+
+  for name, snbt in corpus.items():
+    check(name, lib_nbt.parse_snbt(snbt))
+  rng = random.Random(seed)
+  for i in range(fuzz):
+    check(f"fuzz #{i}", {"root": _random_value(rng)})
+  return failures
+
+# Baselines
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+  "Prints the change of each benchmark against a baseline and returns the regressions."
+  regressions = []
+  for key, result in results.items():
+    if key not in baseline:
+      continue
+    change = (result["seconds"] / baseline[key]["seconds"] - 1) * 100
+    memory = result["peak_kb"] - baseline[key]["peak_kb"]
+    flag = ""
+    if change > threshold:
+      flag = "  REGRESSION"
+      regressions.append(key)
+    print(f"{key:40} {change:+7.1f}% time {memory:+9.1f} KB peak{flag}")
+  return regressions
+
+def main(argv: List[str]) -> int:
+  parser = argparse.ArgumentParser(description="Benchmark and check lib_nbt.")
+  parser.add_argument("--quick", action="store_true", help="shorter timings, for a smoke test")
+  parser.add_argument("--fuzz", type=int, default=500, help="number of random round-trip checks")
+  parser.add_argument("--save", help="write results to this JSON baseline file")
+  parser.add_argument("--compare", help="compare results against this JSON baseline file")
+  parser.add_argument("--threshold", type=float, default=15.0, help="slowdown percent counted as a regression")
+  args = parser.parse_args(argv)
+
+  corpus = build_corpus()
+  print("corpus: " + ", ".join(f"{name} ({len(snbt)} chars)" for name, snbt in corpus.items()))
+
+  failures = check_round_trips(corpus, args.fuzz)
+  for failure in failures:
+    print(failure)
+  print(f"round trips: {len(failures)} failures in {len(corpus) + args.fuzz} checks")
+
+  results = run_benchmarks(corpus, 0.05 if args.quick else 0.5)
+
+  status = 1 if failures else 0
+  if args.compare:
+    with open(args.compare) as f:
+      regressions = compare(results, json.load(f)["results"], args.threshold)
+    if regressions:
+      print(f"{len(regressions)} regressions over {args.threshold}%")
+      status = 1
+  if args.save:
+    with open(args.save, "w") as f:
+      json.dump({"python": sys.version, "results": results}, f, indent=2)
+  return status
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,524 @@
+#!/usr/bin/python3
+
+r"""lib_region v1
+
+Reads chunks from Anvil region files (`region/r.<x>.<z>.mca`) of saved worlds, for offline
+analysis without the game running. Chunk NBT is returned as by lib_nbt.parse_nbt().
+
+Requires:
+  lib_nbt
+
+Usage:
+  standalone: `\lib_region <r.x.z.mca>` lists the chunks in a region file
+              `\lib_region <r.x.z.mca> <chunkX> <chunkZ>` prints a chunk as SNBT
+              `\lib_region <level.dat>` prints a binary NBT file as SNBT
+              `\lib_region scan <region dir> <block> [<block> ...]` finds blocks in all regions
+  library: `with lib_region.RegionFile(path) as region:`
+           `  for x, z in region.chunks(): region.read_chunk(x, z) -> dict`
+           `for match in lib_region.scan_regions(paths, {"diamond_ore"}): ...`
+           `lib_region.count_blocks(chunk, {"minecraft:diamond_ore"}) -> dict`
+"""
+
+import array
+import gzip
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+
+import lib_nbt
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+SECTOR_SIZE = 4096
+CHUNKS_PER_REGION = 1024
+
+# Chunk compression types
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+COMPRESSION_LZ4 = 4
+_EXTERNAL = 128  # Flag for chunks stored in a separate `c.<x>.<z>.mcc` file
+
+_location = struct.Struct(">I")
+_chunk_header = struct.Struct(">IB")
+_region_name_re = re.compile(r"r\.(-?\d+)\.(-?\d+)\.mca$")
+
+def _decompress_chunk(compression: int, data: bytes) -> bytes:
+  if compression == COMPRESSION_ZLIB:
+    return zlib.decompress(data)
+  if compression == COMPRESSION_GZIP:
+    return gzip.decompress(data)
+  if compression == COMPRESSION_NONE:
+    return data
+  if compression == COMPRESSION_LZ4:
+    try:
+      import lz4.block
+    except ImportError:
+      raise ValueError("LZ4 compressed chunks need the `lz4` package") from None
+    return _decompress_lz4(lz4.block, data)
+  raise ValueError(f"Unknown chunk compression type {compression}")
+
+def _decompress_lz4(block: Any, data: bytes) -> bytes:
+  "Decompresses the block stream that Java's LZ4BlockOutputStream writes."
+  out = bytearray()
+  pos = 0
+  while pos < len(data):
+    token = data[pos + 8]
+    compressed_size, size = struct.unpack_from("<ii", data, pos + 9)
+    payload = data[pos + 21:pos + 21 + compressed_size]
+    pos += 21 + compressed_size
+    if size == 0:
+      break  # End marker
+    out += payload if token & 0xf0 == 0x10 else block.decompress(payload, uncompressed_size=size)
+  return bytes(out)
+
+class RegionFile:
+  """A memory-mapped Anvil region file of 32x32 chunks.
+
+  Only the header entries of the chunks asked for are read, and each chunk is
+  decompressed only when read. Chunk coordinates can be absolute or relative to the
+  region; only their lowest 5 bits are used.
+  """
+
+  def __init__(self, path: str):
+    self.path = path
+    m = _region_name_re.search(os.path.basename(path))
+    self.region_x, self.region_z = (int(m.group(1)), int(m.group(2))) if m else (None, None)
+    self._file = open(path, "rb")
+    size = os.fstat(self._file.fileno()).st_size
+    # mmap can't map empty files; the game leaves those behind for regions without chunks
+    self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    self._chunk_count: Optional[int] = None
+
+  def close(self) -> None:
+    if isinstance(self._map, mmap.mmap):
+      self._map.close()
+    self._file.close()
+
+  def __enter__(self) -> "RegionFile":
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback) -> None:
+    self.close()
+
+  @staticmethod
+  def _index(x: int, z: int) -> int:
+    return (x & 31) + (z & 31) * 32
+
+  def _location(self, index: int) -> Tuple[int, int]:
+    "Returns the (sector offset, sector count) of a chunk, (0, 0) if it isn't present."
+    if len(self._map) < 2 * SECTOR_SIZE:
+      return 0, 0
+    entry, = _location.unpack_from(self._map, index * 4)
+    return entry >> 8, entry & 0xff
+
+  def has_chunk(self, x: int, z: int) -> bool:
+    return self._location(self._index(x, z))[0] != 0
+
+  def timestamp(self, x: int, z: int) -> int:
+    "Returns when the chunk was last saved, in seconds since the epoch, 0 if never."
+    if len(self._map) < 2 * SECTOR_SIZE:
+      return 0
+    return _location.unpack_from(self._map, SECTOR_SIZE + self._index(x, z) * 4)[0]
+
+  def chunks(self) -> Iterator[Tuple[int, int]]:
+    "Yields the absolute (x, z) coordinates of the chunks present in this region."
+    base_x = (self.region_x or 0) * 32
+    base_z = (self.region_z or 0) * 32
+    for index in range(CHUNKS_PER_REGION):
+      if self._location(index)[0]:
+        yield base_x + (index & 31), base_z + (index >> 5)
+
+  def chunk_count(self) -> int:
+    if self._chunk_count is None:
+      self._chunk_count = sum(1 for _ in self.chunks())
+    return self._chunk_count
+
+  def read_chunk_data(self, x: int, z: int) -> Optional[bytes]:
+    "Returns the decompressed binary NBT of a chunk, or None if the chunk isn't present."
+    offset, sectors = self._location(self._index(x, z))
+    if offset == 0:
+      return None
+    start = offset * SECTOR_SIZE
+    if start + _chunk_header.size > len(self._map):
+      raise ValueError(f"Chunk ({x}, {z}) is outside {self.path}")
+    length, compression = _chunk_header.unpack_from(self._map, start)
+    if compression & _EXTERNAL:
+      external = os.path.join(
+          os.path.dirname(self.path),
+          f"c.{(self.region_x or 0) * 32 + (x & 31)}.{(self.region_z or 0) * 32 + (z & 31)}.mcc")
+      with open(external, "rb") as f:
+        data = f.read()
+    else:
+      end = start + 4 + length
+      if length == 0 or end > len(self._map):
+        raise ValueError(f"Chunk ({x}, {z}) is truncated in {self.path}")
+      data = self._map[start + 5:end]
+    return _decompress_chunk(compression & ~_EXTERNAL, data)
+
+  def read_chunk(self, x: int, z: int, typed: bool = False) -> Optional[Dict[str, Any]]:
+    "Returns the NBT of a chunk, or None if the chunk isn't present. See lib_nbt.parse_nbt()."
+    data = self.read_chunk_data(x, z)
+    return None if data is None else lib_nbt.parse_nbt(data, typed)
+
+def write_region_file(
+    path: str, chunks: Mapping[Tuple[int, int], Any], compression: int = COMPRESSION_ZLIB,
+    timestamp: int = 0) -> None:
+  """Writes a region file from chunk NBT values keyed by chunk (x, z), e.g. for test fixtures.
+
+  Chunk values are serialized with lib_nbt.to_nbt(), or written as is if they're bytes.
+  """
+  locations = bytearray(SECTOR_SIZE)
+  timestamps = bytearray(SECTOR_SIZE)
+  body = bytearray()
+  for (x, z), value in chunks.items():
+    data = value if isinstance(value, (bytes, bytearray)) else lib_nbt.to_nbt(value)
+    if compression == COMPRESSION_ZLIB:
+      data = zlib.compress(data)
+    elif compression == COMPRESSION_GZIP:
+      data = gzip.compress(data, mtime=0)
+    elif compression != COMPRESSION_NONE:
+      raise ValueError(f"Can't write chunk compression type {compression}")
+    record = _chunk_header.pack(len(data) + 1, compression) + data
+    record += bytes(-len(record) % SECTOR_SIZE)
+    sectors = len(record) // SECTOR_SIZE
+    if sectors > 255:
+      raise ValueError(f"Chunk ({x}, {z}) is too big for a region file")
+    index = RegionFile._index(x, z)
+    offset = 2 + len(body) // SECTOR_SIZE
+    _location.pack_into(locations, index * 4, offset << 8 | sectors)
+    _location.pack_into(timestamps, index * 4, timestamp)
+    body += record
+  with open(path, "wb") as f:
+    f.write(locations)
+    f.write(timestamps)
+    f.write(body)
+
+# Chunk sections
+
+def _block_name(name: str) -> str:
+  return name if ":" in name else "minecraft:" + name
+
+def _section_parts(section: Mapping[str, Any]) -> Tuple[List[Any], Any]:
+  "Returns the block palette and packed indices of a chunk section, in 1.18+ or older format."
+  states = section.get("block_states")
+  if states is not None:
+    return states.get("palette") or [], states.get("data")
+  return section.get("Palette") or [], section.get("BlockStates")
+
+# Since 1.16 (DataVersion 2529), indices don't span two longs; the bits left over at the end
+# of each long are unused. Before, indices were packed back to back across longs.
+COMPACT_PACKING_VERSION = 2529
+
+def _unpack_numpy(data: Any, bits: int) -> Any:
+  "Unpacks all indices at once: each long is shifted by every index offset in one operation."
+  words = numpy.asarray(data, dtype=numpy.int64).view(numpy.uint64)
+  shifts = numpy.arange(64 // bits, dtype=numpy.uint64) * numpy.uint64(bits)
+  values = (words[:, None] >> shifts) & numpy.uint64((1 << bits) - 1)
+  indices = numpy.zeros(4096, dtype=numpy.uint16)
+  values = values.reshape(-1)[:4096]
+  indices[:len(values)] = values
+  return indices
+
+def _unpack_python(data: Any, bits: int) -> Any:
+  per_long = 64 // bits
+  mask = (1 << bits) - 1
+  indices = array.array("H", bytes(8192))
+  i = 0
+  for word in data:
+    word &= 0xffffffffffffffff  # Longs are signed
+    for _ in range(per_long):
+      if i == 4096:
+        return indices
+      indices[i] = word & mask
+      word >>= bits
+      i += 1
+  return indices
+
+def _unpack_spanning_numpy(data: Any, bits: int) -> Any:
+  "Unpacks pre-1.16 indices, which continue from one long into the next."
+  words = numpy.append(numpy.asarray(data, dtype=numpy.int64).view(numpy.uint64), numpy.uint64(0))
+  starts = numpy.arange(4096, dtype=numpy.uint64) * numpy.uint64(bits)
+  word = (starts >> numpy.uint64(6)).astype(numpy.intp)
+  offset = starts & numpy.uint64(63)
+  # Shifting by 64 isn't defined, so the next long is shifted in two steps
+  high = (words[word + 1] << numpy.uint64(1)) << (numpy.uint64(63) - offset)
+  values = ((words[word] >> offset) | high) & numpy.uint64((1 << bits) - 1)
+  return values.astype(numpy.uint16)
+
+def _unpack_spanning_python(data: Any, bits: int) -> Any:
+  mask = (1 << bits) - 1
+  indices = array.array("H", bytes(8192))
+  buffer = buffered = i = 0
+  for word in data:
+    buffer |= (word & 0xffffffffffffffff) << buffered
+    buffered += 64
+    while buffered >= bits and i < 4096:
+      indices[i] = buffer & mask
+      buffer >>= bits
+      buffered -= bits
+      i += 1
+  return indices
+
+def decode_section(section: Mapping[str, Any], data_version: Optional[int] = None) -> Tuple[List[str], Any]:
+  """Returns the block names in a chunk section's palette and the palette index of each of
+  its 4096 blocks, in YZX order (index `y * 256 + z * 16 + x`).
+
+  Indices are a NumPy uint16 array if NumPy is installed, else an `array.array("H")`.
+  Sections that hold a single block type have no packed data; all their indices are 0.
+  `data_version` is the chunk's DataVersion; chunks older than 1.16 pack indices across
+  longs, and are assumed to be newer if it's not given.
+
+  Raises:
+    ValueError: if the section has fewer longs than its palette size calls for, e.g. because
+      an old chunk was decoded without its DataVersion.
+  """
+  palette, data = _section_parts(section)
+  names = [entry.get("Name", "minecraft:air") for entry in palette]
+  if data is None or len(names) <= 1 or len(data) == 0:
+    if numpy is not None:
+      return names, numpy.zeros(4096, dtype=numpy.uint16)
+    return names, array.array("H", bytes(8192))
+  bits = max(4, (len(names) - 1).bit_length())
+  spanning = data_version is not None and data_version < COMPACT_PACKING_VERSION
+  needed = 64 * bits if spanning else -(-4096 // (64 // bits))
+  if len(data) < needed:
+    raise ValueError(f"Section has {len(data)} longs of block data, {bits} bits per block need {needed}")
+  if spanning:
+    return names, _unpack_spanning_numpy(data, bits) if numpy is not None else _unpack_spanning_python(data, bits)
+  return names, _unpack_numpy(data, bits) if numpy is not None else _unpack_python(data, bits)
+
+def count_section_blocks(section: Mapping[str, Any], data_version: Optional[int] = None) -> Dict[str, int]:
+  "Returns the number of blocks of each type in a chunk section; see decode_section()."
+  palette, data = _section_parts(section)
+  if data is None and len(palette) == 1:
+    return {palette[0].get("Name", "minecraft:air"): 4096}
+  names, indices = decode_section(section, data_version)
+  if numpy is not None:
+    counts = enumerate(numpy.bincount(indices, minlength=len(names)).tolist())
+  else:
+    counts = Counter(indices).items()
+  result: Dict[str, int] = {}
+  for index, count in counts:
+    if count and index < len(names):
+      name = names[index]  # A name can repeat in the palette with different properties
+      result[name] = result.get(name, 0) + count
+  return result
+
+def find_section_blocks(
+    section: Mapping[str, Any], blocks: Set[str],
+    data_version: Optional[int] = None) -> List[Tuple[str, int, int, int]]:
+  "Returns (block name, x, y, z) positions within a chunk section of the given block types."
+  palette, _ = _section_parts(section)
+  if not any(entry.get("Name") in blocks for entry in palette):
+    return []  # Nothing to find, so don't decode
+  names, indices = decode_section(section, data_version)
+  wanted = [i for i, name in enumerate(names) if name in blocks]
+  if numpy is not None:
+    positions = numpy.flatnonzero(numpy.isin(indices, wanted))
+    found = zip(positions.tolist(), indices[positions].tolist())
+  else:
+    wanted_set = set(wanted)
+    found = [(i, index) for i, index in enumerate(indices) if index in wanted_set]
+  return [(names[index], i & 15, i >> 8, i >> 4 & 15) for i, index in found]
+
+def _chunk_sections(chunk: Mapping[str, Any]) -> Tuple[Mapping[str, Any], List[Any]]:
+  level = chunk.get("Level", chunk)  # Chunks before 1.18 nest everything under "Level"
+  return level, level.get("sections") or level.get("Sections") or []
+
+def find_blocks(chunk: Mapping[str, Any], blocks: Set[str]) -> List[Tuple[str, int, int, int]]:
+  """Returns (block name, x, y, z) world positions of the given block types in a chunk.
+
+  Sections whose palette holds none of `blocks` are skipped without being decoded.
+  """
+  level, sections = _chunk_sections(chunk)
+  data_version = chunk.get("DataVersion")
+  base_x = level.get("xPos", 0) * 16
+  base_z = level.get("zPos", 0) * 16
+  matches = []
+  for section in sections:
+    base_y = section.get("Y", 0) * 16
+    matches += [(name, base_x + x, base_y + y, base_z + z)
+                for name, x, y, z in find_section_blocks(section, blocks, data_version)]
+  return matches
+
+def count_blocks(chunk: Mapping[str, Any], blocks: Optional[Set[str]] = None) -> Dict[str, int]:
+  "Returns the number of blocks of each type in a chunk, only of `blocks` if given."
+  result: Dict[str, int] = {}
+  data_version = chunk.get("DataVersion")
+  for section in _chunk_sections(chunk)[1]:
+    if blocks is not None and not any(entry.get("Name") in blocks for entry in _section_parts(section)[0]):
+      continue
+    for name, count in count_section_blocks(section, data_version).items():
+      if blocks is None or name in blocks:
+        result[name] = result.get(name, 0) + count
+  return result
+
+# Scanning many regions
+
+BlockMatch = namedtuple("BlockMatch", ["block", "x", "y", "z", "region"])
+
+class ChunkError(Exception):
+  "A chunk of a region that couldn't be read or parsed; passed to the `on_error` of scan_regions()."
+
+  def __init__(self, x: int, z: int, message: str):
+    super().__init__(x, z, message)
+    self.x = x
+    self.z = z
+    self.message = message
+
+  def __str__(self) -> str:
+    return f"chunk {self.x} {self.z}: {self.message}"
+
+# Chunks scanned per worker task; a region has up to 1024, so a few regions still use all workers
+CHUNKS_PER_TASK = 128
+
+def _region_chunks(path: str) -> List[Tuple[int, int]]:
+  with RegionFile(path) as region:
+    return list(region.chunks())
+
+def _scan_chunks(
+    path: str, chunks: List[Tuple[int, int]],
+    blocks: Set[str]) -> Tuple[List[Tuple[str, int, int, int]], List[ChunkError]]:
+  "Finds blocks in some chunks of a region file; runs in a worker process."
+  matches = []
+  errors = []
+  with RegionFile(path) as region:
+    for x, z in chunks:
+      try:
+        data = region.read_chunk_data(x, z)
+        # Don't parse chunks that can't contain any of the blocks
+        if not any(name.encode() in data for name in blocks):
+          continue
+        matches += find_blocks(lib_nbt.parse_nbt(data), blocks)
+      except Exception as e:
+        # The message, not the exception, so that the error always pickles
+        errors.append(ChunkError(x, z, f"{type(e).__name__}: {e}"))
+  return matches, errors
+
+def _load_checkpoint(checkpoint: Optional[str]) -> Set[str]:
+  if checkpoint is None or not os.path.exists(checkpoint):
+    return set()
+  with open(checkpoint) as f:
+    return set(json.load(f).get("scanned", []))
+
+def _save_checkpoint(checkpoint: str, scanned: Set[str]) -> None:
+  temp = checkpoint + ".tmp"
+  with open(temp, "w") as f:
+    json.dump({"scanned": sorted(scanned)}, f)
+  os.replace(temp, checkpoint)  # Atomic, so an interrupted scan never leaves a broken checkpoint
+
+def _report_error(path: str, error: Exception) -> None:
+  print(f"Can't scan {path}: {error}", file=sys.stderr)
+
+def scan_regions(
+    paths: Iterable[str], blocks: Iterable[str], workers: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+    on_error: Callable[[str, Exception], None] = _report_error) -> Iterator[BlockMatch]:
+  """Finds blocks in many region files in parallel, yielding matches as chunks are scanned.
+
+  The chunks of each region are scanned in batches of CHUNKS_PER_TASK in a process pool of
+  `workers` processes (default: one per CPU), or in this process if `workers` is 0, so even
+  a single region is spread over all workers. Block names without a namespace get `minecraft:`.
+
+  A chunk that can't be read or parsed, e.g. because it's corrupt, is passed to `on_error`
+  as a ChunkError with its coordinates, and the scan goes on with the other chunks. A region
+  that can't be read at all is passed to `on_error` with the exception. By default errors
+  are printed to stderr.
+
+  If `checkpoint` is a file path, regions listed in it are skipped, and each region is
+  added to it once all its matches have been yielded, so an interrupted scan can be
+  resumed. Regions that can't be read aren't added, so they're tried again on resume;
+  regions with bad chunks are, since their other matches have been yielded. Scripts that
+  use worker processes need an `if __name__ == "__main__":` guard.
+  """
+  blocks = {_block_name(block) for block in blocks}
+  scanned = _load_checkpoint(checkpoint)
+  paths = [path for path in paths if os.path.abspath(path) not in scanned]
+  pending: Dict[str, int] = {}  # Region path -> batches not scanned yet
+  failed: Set[str] = set()
+
+  def batches() -> Iterator[Tuple[str, List[Tuple[int, int]]]]:
+    for path in paths:
+      try:
+        chunks = _region_chunks(path)
+      except Exception as e:
+        on_error(path, e)
+        continue
+      pending[path] = max(1, -(-len(chunks) // CHUNKS_PER_TASK))
+      for i in range(0, len(chunks), CHUNKS_PER_TASK):
+        yield path, chunks[i:i + CHUNKS_PER_TASK]
+      if not chunks:
+        yield path, []
+
+  def finish(path: str, result) -> Iterator[BlockMatch]:
+    try:
+      matches, errors = result()
+    except Exception as e:
+      if path not in failed:
+        failed.add(path)
+        on_error(path, e)
+    else:
+      for error in errors:
+        on_error(path, error)
+      for match in matches:
+        yield BlockMatch(*match, path)
+    pending[path] -= 1
+    if pending[path] == 0 and path not in failed and checkpoint is not None:
+      scanned.add(os.path.abspath(path))
+      _save_checkpoint(checkpoint, scanned)
+
+  if workers == 0:
+    for path, chunks in batches():
+      yield from finish(path, lambda: _scan_chunks(path, chunks, blocks))
+    return
+
+  executor = ProcessPoolExecutor(max_workers=workers)
+  try:
+    futures = {executor.submit(_scan_chunks, path, chunks, blocks): path for path, chunks in batches()}
+    for future in as_completed(futures):
+      yield from finish(futures[future], future.result)
+  finally:
+    executor.shutdown(wait=True, cancel_futures=True)
+
+def region_paths(directory: str) -> List[str]:
+  "Returns the paths of the region files in a directory such as `<world>/region`."
+  return sorted(
+      os.path.join(directory, name) for name in os.listdir(directory) if _region_name_re.match(name))
+
+def main(args):
+  if not args:
+    print(__doc__)
+    return
+  if args[0] == "scan" and len(args) >= 3:
+    directory = args[1]
+    checkpoint = os.path.join(directory, "scan_checkpoint.json")
+    for match in scan_regions(region_paths(directory), args[2:], checkpoint=checkpoint):
+      print(f"{match.block} {match.x} {match.y} {match.z}")
+    return
+  path = args[0]
+  if not path.endswith(".mca"):
+    print(lib_nbt.to_snbt(lib_nbt.read_nbt_file(path)))
+    return
+  with RegionFile(path) as region:
+    if len(args) >= 3:
+      chunk = region.read_chunk(int(args[1]), int(args[2]))
+      print("Chunk not present" if chunk is None else lib_nbt.to_snbt(chunk))
+    else:
+      for x, z in region.chunks():
+        print(f"chunk {x} {z} saved at {region.timestamp(x, z)}")
+      print(f"{region.chunk_count()} chunks")
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
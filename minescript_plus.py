@@ -14,13 +14,23 @@
     official discord was used in this API, mostly in the Inventory class.
 """
 import asyncio
+import atexit
+import json
 import threading
-from time import sleep
+from math import floor
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from time import monotonic
 from typing import Callable, Literal, Any
-from minescript import (set_default_executor, EventQueue, EventType, script_loop, render_loop, ItemStack, TargetedBlock,
+from minescript import (set_default_executor, EventQueue, EventType, script_loop, render_loop, tick_loop, ItemStack, TargetedBlock,
                         version_info, log, player_inventory, player_get_targeted_block, press_key_bind, screen_name, player_name,
-                        job_info, container_get_items)
-from lib_java import JavaClass, java_class_map, java_member_map
+                        job_info, container_get_items, run_tasks, Task, java_call_method, java_int, java_release,
+                        java_to_string, java_array_index, java_bool, java_string, java_ctor, java_new_instance,
+                        java_class, java_member,
+                        java_access_field, player_orientation, player_set_orientation,
+                        player_look_at, player_press_use, player_press_attack, player_inventory_select_slot, player_position)
 import lib_nbt
 
 set_default_executor(script_loop)
@@ -93,6 +103,7 @@ class Event:
                         once: bool = False,
                         check_interval: float = 0.05,
                         ) -> Listener:
+        _define_builtin_events()
         event_def = _events[event_name]
         condition = event_def.get_condition()
         event_interval = event_def.interval
@@ -144,6 +155,7 @@ class Event:
             
     @staticmethod
     def set_trigger(event_name: EventName | str, value: bool):
+        _define_builtin_events()
         event = _events.get(event_name)
         if not event or event.mode != "flag":
             raise ValueError(f"Event '{event_name}' is not of type flag.")
@@ -174,35 +186,266 @@ def __open_screen_event_callback():
         return True, (r,), {}
     return False, (), {}
 
-Event.define_event(EventDefinition(
-    "on_title", mode="callback", condition=__title_event_callback))
-Event.define_event(EventDefinition(
-    "on_subtitle", mode="callback", condition=__subtitle_event_callback))
-Event.define_event(EventDefinition(
-    "on_actionbar", mode="callback", condition=__actionbar_event_callback))
-Event.define_event(EventDefinition(
-    "on_open_screen", mode="callback", condition=__open_screen_event_callback, interval=0.05))
+_builtin_events_defined = False
+
+def _define_builtin_events():
+    """Defines the built-in events the first time any event is used."""
+    global _builtin_events_defined
+    if _builtin_events_defined:
+        return
+    _builtin_events_defined = True
+    for event in (
+        EventDefinition("on_title", mode="callback", condition=__title_event_callback),
+        EventDefinition("on_subtitle", mode="callback", condition=__subtitle_event_callback),
+        EventDefinition("on_actionbar", mode="callback", condition=__actionbar_event_callback),
+        EventDefinition("on_open_screen", mode="callback", condition=__open_screen_event_callback, interval=0.05),
+    ):
+        _events.setdefault(event.name, event)
+    # Drop an actionbar message left over from before the first listener
+    _java.mc.gui.setOverlayMessage(None, False)
 
 
-class Keybind:
-    def __init__(self) -> None:
-        # Key map (int, GLFW code) -> (callback, name, category, description)
-        self.keybinds: dict[int, tuple[Callable[[], None], str, str, str]] = {}
+KeyTrigger = Literal["press", "release"]
+BindingKind = Literal["key", "chord", "sequence"]
+
+class InputBinding:
+    """
+    A callback registered on the InputHub for a single key, a chord or a sequence of keys.
+    Returned by the InputHub.bind_* methods, pass it to InputHub.unbind() to remove it.
+    """
+    def __init__(
+        self,
+        kind: BindingKind,
+        keys: tuple[int, ...],
+        callback: Callable[[], None],
+        trigger: KeyTrigger = "release",
+        debounce: float = 0.0,
+        coalesce: bool = True,
+        timeout: float = 1.0,
+    ):
+        self.kind: BindingKind = kind
+        self.keys: tuple[int, ...] = keys
+        self.callback: Callable[[], None] = callback
+        self.trigger: KeyTrigger = trigger
+        self.debounce: float = debounce
+        self.coalesce: bool = coalesce
+        self.timeout: float = timeout
+        self._key_set: frozenset[int] = frozenset(keys)
+        self._last_fired: float | None = None
+        self._busy: bool = False
+        self._rerun: bool = False
+        self._armed: bool = True    # chord: fires once per hold
+        self._recent: deque[int] = deque(maxlen=len(keys))  # sequence: last presses
+        self._last_press: float = 0.0
+
+    def __repr__(self) -> str:
+        return f"InputBinding({self.kind}, {list(self.keys)})"
+
+    def _feed(self, key: int, action: int, down: set[int], now: float) -> bool:
+        """Advances this binding's state machine with a key event. Returns True if it should fire."""
+        if self.kind == "key":
+            if key != self.keys[0]:
+                return False
+            return action == (0 if self.trigger == "release" else 1)
+
+        if self.kind == "chord":
+            if key not in self._key_set:
+                return False
+            if action == 0:
+                self._armed = True
+                return False
+            if self._armed and self._key_set <= down:
+                self._armed = False
+                return True
+            return False
+
+        # sequence: only fresh presses advance it, repeats and releases are ignored
+        if action != 1:
+            return False
+        if self._recent and now - self._last_press > self.timeout:
+            self._recent.clear()
+        self._recent.append(key)
+        self._last_press = now
+        if tuple(self._recent) == self.keys:
+            self._recent.clear()
+            return True
+        return False
+
+class InputHub:
+    """
+    Process-wide input hub: a single key listener shared by every Keybind, with callbacks
+    dispatched on a bounded worker pool so a slow callback never blocks other hotkeys.
+
+    Each binding can be debounced (triggers closer than `debounce` seconds are dropped) and
+    coalesced (triggers received while its callback is still running collapse into one rerun).
+    """
+    _instance: "InputHub | None" = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._lock = threading.Lock()
+        self._bindings: list[InputBinding] = []
+        self._raw_listeners: list[Callable[[Any], None]] = []
+        self._down: set[int] = set()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="InputHub")
         self._listener_thread: threading.Thread = threading.Thread(
             target=self._key_listener_loop,
             daemon=True
         )
         self._listener_thread.start()
 
+    @classmethod
+    def get(cls, max_workers: int = 4) -> "InputHub":
+        """
+        Returns the shared InputHub, starting it on first use.
+
+        Args:
+            max_workers (int, optional): Size of the callback worker pool, only used when the hub is created. Defaults to 4.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = InputHub(max_workers)
+            return cls._instance
+
+    def bind_key(
+        self,
+        key: int,
+        callback: Callable[[], None],
+        trigger: KeyTrigger = "release",
+        debounce: float = 0.0,
+        coalesce: bool = True
+    ) -> InputBinding:
+        """
+        Calls `callback` when `key` (GLFW code) is released, or pressed if trigger is "press".
+        """
+        return self._add(InputBinding("key", (key,), callback, trigger, debounce, coalesce))
+
+    def bind_chord(
+        self,
+        keys: list[int],
+        callback: Callable[[], None],
+        debounce: float = 0.0,
+        coalesce: bool = True
+    ) -> InputBinding:
+        """
+        Calls `callback` once when all `keys` are held down together.
+        """
+        return self._add(InputBinding("chord", tuple(keys), callback, "press", debounce, coalesce))
+
+    def bind_sequence(
+        self,
+        keys: list[int],
+        callback: Callable[[], None],
+        timeout: float = 1.0,
+        debounce: float = 0.0,
+        coalesce: bool = True
+    ) -> InputBinding:
+        """
+        Calls `callback` when `keys` are pressed in order, each within `timeout` seconds of the previous one.
+        """
+        if not keys:
+            raise ValueError("[InputHub] A key sequence needs at least one key.")
+        return self._add(InputBinding("sequence", tuple(keys), callback, "press", debounce, coalesce, timeout))
+
+    def unbind(self, binding: InputBinding) -> None:
+        with self._lock:
+            if binding in self._bindings:
+                self._bindings.remove(binding)
+
+    def add_raw_listener(self, listener: Callable[[Any], None]) -> None:
+        """
+        Calls `listener` with every key and mouse event, on the listener thread, so it must return quickly.
+        """
+        with self._lock:
+            self._raw_listeners.append(listener)
+
+    def remove_raw_listener(self, listener: Callable[[Any], None]) -> None:
+        with self._lock:
+            if listener in self._raw_listeners:
+                self._raw_listeners.remove(listener)
+
+    def _add(self, binding: InputBinding) -> InputBinding:
+        with self._lock:
+            self._bindings.append(binding)
+        return binding
+
+    def _key_listener_loop(self) -> None:
+        with EventQueue() as event_queue:
+            event_queue.register_key_listener()
+            event_queue.register_mouse_listener()
+            while True:
+                event = event_queue.get()
+                self._on_raw_event(event)
+                if event.type == EventType.KEY:
+                    self._on_key(event.key, event.action)
+
+    def _on_raw_event(self, event: Any) -> None:
+        # Listeners can be added or removed from other threads, e.g. by callbacks on the pool
+        with self._lock:
+            listeners = list(self._raw_listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                log(f"[InputHub] Error in raw listener: {e}")
+
+    def _on_key(self, key: int, action: int) -> None:
+        now = monotonic()
+        with self._lock:
+            if action == 0:
+                self._down.discard(key)
+            else:
+                self._down.add(key)
+            for binding in self._bindings:
+                if binding._feed(key, action, self._down, now):  # pylint: disable=W0212
+                    self._dispatch(binding, now)
+
+    def _dispatch(self, binding: InputBinding, now: float) -> None:
+        # Called with self._lock held
+        if binding._last_fired is not None and now - binding._last_fired < binding.debounce:
+            return
+        binding._last_fired = now
+        if binding.coalesce:
+            if binding._busy:
+                binding._rerun = True
+                return
+            binding._busy = True
+        self._pool.submit(self._run, binding)
+
+    def _run(self, binding: InputBinding) -> None:
+        while True:
+            try:
+                binding.callback()
+            except Exception as e:
+                log(f"[InputHub] Error in callback for {binding}: {e}")
+            if not binding.coalesce:
+                return
+            with self._lock:
+                if not binding._rerun:
+                    binding._busy = False
+                    return
+                binding._rerun = False
+
+class Keybind:
+    def __init__(self) -> None:
+        # Key map (int, GLFW code) -> (callback, name, category, description)
+        self.keybinds: dict[int, tuple[Callable[[], None], str, str, str]] = {}
+        self._bindings: dict[int, InputBinding] = {}
+        self._hub: InputHub = InputHub.get()
+
     def set_keybind(
         self,
         key: int,
         callback: Callable[[], None],
         name: str = "",
         category: str = "",
-        description: str = ""
+        description: str = "",
+        debounce: float = 0.0
     ) -> None:
+        if key in self._bindings:
+            self._hub.unbind(self._bindings[key])
         self.keybinds[key] = (callback, name, category, description)
+        self._bindings[key] = self._hub.bind_key(key, callback, debounce=debounce)
 
     def modify_keybind(
         self,
@@ -213,142 +456,188 @@ class Keybind:
         description: str = ""
     ) -> None:
         if key in self.keybinds:
-            self.keybinds[key] = (callback, name, category, description)
+            self.set_keybind(key, callback, name, category, description, self._bindings[key].debounce)
         else:
             raise ValueError(f"[Keybind] No existing keybind for {key} to modify.")
 
     def remove_keybind(self, key: int) -> None:
         if key in self.keybinds:
             del self.keybinds[key]
+            self._hub.unbind(self._bindings.pop(key))
         else:
             raise ValueError(f"[Keybind] No existing keybind for {key} to remove.")
 
-    def _key_listener_loop(self) -> None:
-        with EventQueue() as event_queue:
-            event_queue.register_key_listener()
-            while True:
-                event = event_queue.get()
-                if event.type == EventType.KEY:
-                    key: int = event.key
-
-                    if event.action == 0 and key in self.keybinds:
-                        callback, *_ = self.keybinds[key]
-                        try:
-                            callback()
-                        except Exception as e:
-                            log(f"[Keybind] Error in callback for key {key}: {e}")
-    
+    def set_chord(self, keys: list[int], callback: Callable[[], None], debounce: float = 0.0) -> InputBinding:
+        """
+        Calls `callback` when all `keys` (GLFW codes) are held down together, e.g. [341, 75] for Ctrl+K.
+        """
+        return self._hub.bind_chord(keys, callback, debounce=debounce)
+
+    def set_sequence(self, keys: list[int], callback: Callable[[], None], timeout: float = 1.0) -> InputBinding:
+        """
+        Calls `callback` when `keys` (GLFW codes) are pressed one after another, each within `timeout` seconds.
+        """
+        return self._hub.bind_sequence(keys, callback, timeout=timeout)
+
+    def remove_binding(self, binding: InputBinding) -> None:
+        self._hub.unbind(binding)
+
 
 # Mojang -> Intermediary mappings
 fabric = False
-mc_class_name = version_info().minecraft_class_name
-if mc_class_name == "net.minecraft.class_310":
-    fabric = True
-    java_class_map.update({
-        "net.minecraft.client.Minecraft": "net.minecraft.class_310",                # net.minecraft.client.MinecraftClient
-        "net.minecraft.world.inventory.ClickType": "net.minecraft.class_1713",      # net.minecraft.screen.slot.SlotActionType
-        "net.minecraft.network.chat.Component": "net.minecraft.class_2561",         # net.minecraft.network.chat.Text
-        "net.minecraft.client.KeyMapping": "net.minecraft.class_304",               # net.minecraft.client.option.KeyBinding
-        "com.mojang.blaze3d.platform.InputConstants": "net.minecraft.class_3675",   # net.minecraft.client.util.InputUtil
-        "net.minecraft.world.Difficulty": "net.minecraft.class_1267",
-        "net.minecraft.core.BlockPos": "net.minecraft.class_2338"
-    })
-    java_member_map.update({
-        "getInstance": "method_1551",
-        "getConnection": "method_48296",
-        "disconnect": "method_10747",
-        "options": "field_1690",
-        "name": "field_3752",
-        "ip": "field_3761",
-        "status": "field_3753",  # playerCountLabel
-        "motd": "field_3757",
-        "ping": "field_3758",
-        "protocol": "field_3756",
-        "version": "field_3760",
-        "playerList": "field_3762",
-        "pauseGame": "method_20539", # openGameMenu
-        "isLocalServer": "method_1542", # isInSingleplayer
-        "isLan": "method_2994",
-        "isRealm": "method_52811",
-        "getLatency": "method_2959",
-        "getGameMode": "method_2958",
-        "getProfile": "method_2966",
-        #"getName": "method_8381",
-        "getName": "getName",
-        "getTabListDisplayName": "method_2971",
-        "getTabListOrder": "method_62154",
-        "getTeam": "method_2955",
-        "getDisplayName": "method_1140",
-        "getColor": "method_1202",
-        "isCreative": "method_8386",
-        "isSurvival": "method_8388",
-        "level": "field_1687",
-        "getLevel":"method_2890", # getWorld
-        "getLevelData": "method_28104", # getLevelProperties
-        "isRaining": "method_156",
-        "isThundering": "method_203",
-        "isHardcore": "method_152",
-        "getDifficulty": "method_207",
-        "getSpawnPos": "method_56126",
-        "getGameTime": "method_188", # getTime
-        "getDayTime": "method_217", # getTimeOfDay
-        "player": "field_1724",
-        "connection": "field_3944",
-        "screen": "field_1755",
-        "gui": "field_1705",
-        "gameMode": "field_1761",
-        "keyboardHandler": "field_1774",
-        "getClipboard": "method_1460",
-        "setClipboard": "method_1455",
-        "handleInventoryMouseClick": "method_2906",
-        "getMenu": "method_17577",
-        "containerId": "field_7763",
-        "keyPressed": "method_25404",
-        "quickMoveStack": "method_7601",
-        "literal": "method_43470",
-        "title": "field_2016",
-        "subtitle": "field_2039",
-        "tryCollapseToString": "method_54160",  # getLiteralString()
-        "setTitle": "method_34004",             # setTitle(Text title)
-        "setSubtitle": "method_34002",          # setSubtitle(Text subtitle)
-        "setTimes": "method_34001",             # setTitleTicks(int fadeInTicks, int stayTicks, int fadeOutTicks)
-        "resetTitleTimes": "method_1742",       # setDefaultTitleFade()
-        "clearTitles": "method_34003",          # clearTitle()
-        "setOverlayMessage": "method_1758",     # Gui.setOverlayMessage(Text message, boolean tinted)               # Actionbar
-        "overlayMessageString": "field_2018",   # overlayMessage # Actionbar
-        "getTabList": "method_1750",            # getPlayerListHud()
-        "getPlayerInfos": "method_48213",       # collectPlayerEntries()                                            #  TabList
-        "getOnlinePlayers": "method_2880",      # getPlayerList()
-        "getListedOnlinePlayers": "method_45732",  # getListedPlayerListEntries()
-        "getPlayerInfo": "method_2874",         # getPlayerListEntry(String profileName)
-        "getSkin": "method_52810",              # getSkinTextures()
-        "textureUrl": "comp_1911",
-        "getServerData": "method_45734",        # getServerInfo() 
-        "click": "method_1420",                 # onKeyPressed(InputUtil$Key key)
-        "set": "method_1416",                   # setKeyPressed(InputUtil$Key key, boolean pressed)
-        "getKey": "method_15981",               # fromTranslationKey(String translationKey)
-        "UNKNOWN": "field_16237",               # UNKNOWN_KEY
-        "getFoodData": "method_7344",           # getHungerManager
-        "getFoodLevel": "method_7586",
-        "setFoodLevel": "method_7580",
-        "getSaturationLevel": "method_7589",
-        "setSaturation": "method_7581",
-        "getBlockEntity": "method_8321",
-        "getText": "method_49843",
-        "getMessage": "method_49859"
-    })
-
-Minecraft = JavaClass("net.minecraft.client.Minecraft")
-ClickType = JavaClass("net.minecraft.world.inventory.ClickType")
-Component = JavaClass("net.minecraft.network.chat.Component")
-KeyMapping = JavaClass("net.minecraft.client.KeyMapping")
-InputConstants = JavaClass("com.mojang.blaze3d.platform.InputConstants")
-Difficulty = JavaClass("net.minecraft.world.Difficulty")
-BlockPos = JavaClass("net.minecraft.core.BlockPos")
-
-mc = Minecraft.getInstance()
-
-mc.gui.setOverlayMessage(None, False)
+_mappings_ready = False
+
+def _init_mappings() -> None:
+    """Fills lib_java's class and member maps when running with intermediary (Fabric) names."""
+    global fabric, _mappings_ready
+    if _mappings_ready:
+        return
+    from lib_java import java_class_map, java_member_map
+    mc_class_name = version_info().minecraft_class_name
+    if mc_class_name == "net.minecraft.class_310":
+        fabric = True
+        java_class_map.update({
+            "net.minecraft.client.Minecraft": "net.minecraft.class_310",                # net.minecraft.client.MinecraftClient
+            "net.minecraft.world.inventory.ClickType": "net.minecraft.class_1713",      # net.minecraft.screen.slot.SlotActionType
+            "net.minecraft.network.chat.Component": "net.minecraft.class_2561",         # net.minecraft.network.chat.Text
+            "net.minecraft.client.KeyMapping": "net.minecraft.class_304",               # net.minecraft.client.option.KeyBinding
+            "com.mojang.blaze3d.platform.InputConstants": "net.minecraft.class_3675",   # net.minecraft.client.util.InputUtil
+            "com.mojang.blaze3d.platform.InputConstants$Type": "net.minecraft.class_3675$class_307",  # InputUtil$Type
+            "net.minecraft.world.Difficulty": "net.minecraft.class_1267",
+            "net.minecraft.core.BlockPos": "net.minecraft.class_2338",
+            "net.minecraft.world.level.block.entity.SignBlockEntity": "net.minecraft.class_2625"
+        })
+        java_member_map.update({
+            "getInstance": "method_1551",
+            "getConnection": "method_48296",
+            "disconnect": "method_10747",
+            "options": "field_1690",
+            "name": "field_3752",
+            "ip": "field_3761",
+            "status": "field_3753",  # playerCountLabel
+            "motd": "field_3757",
+            "ping": "field_3758",
+            "protocol": "field_3756",
+            "version": "field_3760",
+            "playerList": "field_3762",
+            "pauseGame": "method_20539", # openGameMenu
+            "isLocalServer": "method_1542", # isInSingleplayer
+            "isLan": "method_2994",
+            "isRealm": "method_52811",
+            "getLatency": "method_2959",
+            "getGameMode": "method_2958",
+            "getProfile": "method_2966",
+            #"getName": "method_8381",
+            "getName": "getName",
+            "getTabListDisplayName": "method_2971",
+            "getTabListOrder": "method_62154",
+            "getTeam": "method_2955",
+            "getDisplayName": "method_1140",
+            "getColor": "method_1202",
+            "isCreative": "method_8386",
+            "isSurvival": "method_8388",
+            "level": "field_1687",
+            "getLevel":"method_2890", # getWorld
+            "getLevelData": "method_28104", # getLevelProperties
+            "isRaining": "method_156",
+            "isThundering": "method_203",
+            "isHardcore": "method_152",
+            "getDifficulty": "method_207",
+            "getSpawnPos": "method_56126",
+            "getGameTime": "method_188", # getTime
+            "getDayTime": "method_217", # getTimeOfDay
+            "player": "field_1724",
+            "connection": "field_3944",
+            "screen": "field_1755",
+            "gui": "field_1705",
+            "gameMode": "field_1761",
+            "keyboardHandler": "field_1774",
+            "getClipboard": "method_1460",
+            "setClipboard": "method_1455",
+            "handleInventoryMouseClick": "method_2906",
+            "getMenu": "method_17577",
+            "inventoryMenu": "field_7498",          # playerScreenHandler
+            "getStateId": "method_37421",           # ScreenHandler.getRevision()
+            "containerId": "field_7763",
+            "keyPressed": "method_25404",
+            "quickMoveStack": "method_7601",
+            "literal": "method_43470",
+            "title": "field_2016",
+            "subtitle": "field_2039",
+            "tryCollapseToString": "method_54160",  # getLiteralString()
+            "setTitle": "method_34004",             # setTitle(Text title)
+            "setSubtitle": "method_34002",          # setSubtitle(Text subtitle)
+            "setTimes": "method_34001",             # setTitleTicks(int fadeInTicks, int stayTicks, int fadeOutTicks)
+            "resetTitleTimes": "method_1742",       # setDefaultTitleFade()
+            "clearTitles": "method_34003",          # clearTitle()
+            "setOverlayMessage": "method_1758",     # Gui.setOverlayMessage(Text message, boolean tinted)               # Actionbar
+            "overlayMessageString": "field_2018",   # overlayMessage # Actionbar
+            "getTabList": "method_1750",            # getPlayerListHud()
+            "getPlayerInfos": "method_48213",       # collectPlayerEntries()                                            #  TabList
+            "getOnlinePlayers": "method_2880",      # getPlayerList()
+            "getListedOnlinePlayers": "method_45732",  # getListedPlayerListEntries()
+            "getPlayerInfo": "method_2874",         # getPlayerListEntry(String profileName)
+            "getSkin": "method_52810",              # getSkinTextures()
+            "textureUrl": "comp_1911",
+            "getServerData": "method_45734",        # getServerInfo() 
+            "click": "method_1420",                 # onKeyPressed(InputUtil$Key key)
+            "set": "method_1416",                   # setKeyPressed(InputUtil$Key key, boolean pressed)
+            "getKey": "method_15981",               # fromTranslationKey(String translationKey)
+            "UNKNOWN": "field_16237",               # UNKNOWN_KEY
+            "getOrCreate": "method_1447",           # InputUtil$Type.createFromCode(int code)
+            "getFoodData": "method_7344",           # getHungerManager
+            "getFoodLevel": "method_7586",
+            "setFoodLevel": "method_7580",
+            "getSaturationLevel": "method_7589",
+            "setSaturation": "method_7581",
+            "getBlockEntity": "method_8321",
+            "getText": "method_49843",
+            "getMessage": "method_49859",
+            "hasChunk": "method_8393",              # isChunkLoaded(int chunkX, int chunkZ)
+            "getChunk": "method_8497",              # getChunk(int chunkX, int chunkZ)
+            "getBlockEntities": "method_12214",
+            "getBlockPos": "method_11016",          # getPos()
+            "asLong": "method_10063"
+        })
+    _mappings_ready = True
+
+class _LazyJava:
+    """
+    Java classes and the Minecraft instance used by the facade classes, resolved on first access.
+    Once resolved, a value is stored as a plain attribute, so later accesses cost nothing extra.
+    """
+    _CLASSES = {
+        "Minecraft": "net.minecraft.client.Minecraft",
+        "ClickType": "net.minecraft.world.inventory.ClickType",
+        "Component": "net.minecraft.network.chat.Component",
+        "KeyMapping": "net.minecraft.client.KeyMapping",
+        "InputConstants": "com.mojang.blaze3d.platform.InputConstants",
+        "InputType": "com.mojang.blaze3d.platform.InputConstants$Type",
+        "Difficulty": "net.minecraft.world.Difficulty",
+        "BlockPos": "net.minecraft.core.BlockPos",
+        "SignBlockEntity": "net.minecraft.world.level.block.entity.SignBlockEntity",
+    }
+    _lock = threading.RLock()
+
+    def __getattr__(self, name: str):
+        if name == "mc":
+            resolve = lambda: self.Minecraft.getInstance()
+        elif name in _LazyJava._CLASSES:
+            resolve = lambda: _java_class(_LazyJava._CLASSES[name])
+        else:
+            raise AttributeError(name)
+        with _LazyJava._lock:
+            if name not in self.__dict__:
+                _init_mappings()
+                self.__dict__[name] = resolve()
+            return self.__dict__[name]
+
+def _java_class(name: str):
+    from lib_java import JavaClass
+    _init_mappings()
+    return JavaClass(name)
+
+_java = _LazyJava()
 
 """
 ClickType
@@ -367,19 +656,700 @@ def _get_private_field(clazz, field_name, super_class: bool=False): # type: igno
         c = clazz.getClass().getSupercLass()
     else:
         c = clazz.getClass()
-    f = java_member_map.get(field_name)
+    from lib_java import java_member_map
+    f = java_member_map.get(field_name, field_name)
     field = c.getDeclaredField(f)
     field.setAccessible(True)
     return field.get(clazz)
 
+_identity_hash_method = None
+
+def _identity_hash(handle: int) -> int:
+    """Returns System.identityHashCode() of a raw Java handle, 0 for null."""
+    global _identity_hash_method
+    if _identity_hash_method is None:
+        from lib_java import find_java_class, find_java_member
+        _identity_hash_method = find_java_member(find_java_class("java.lang.System"), "identityHashCode")
+    id_handle = java_call_method(0, _identity_hash_method, handle)
+    value = int(java_to_string(id_handle))
+    java_release(id_handle)
+    return value
+
+_java_bools: tuple[int, int] | None = None
+
+def _java_bool(value: bool) -> int:
+    """Returns a shared Java Boolean handle for `value`, created once and never released."""
+    global _java_bools
+    if _java_bools is None:
+        _java_bools = (java_bool(False), java_bool(True))
+    return _java_bools[1 if value else 0]
+
+_batch_handles: tuple[int, int, int, int, int, int] | None = None
+_batch_lock = threading.Lock()
+
+def _read_batch(tasks: list[Task], values: list[Task]) -> list[str]:
+    """
+    Runs `tasks` as one task program and returns the string value of each task in `values`.
+
+    Every task in `tasks` must return a Java handle; all of them are released within the same
+    program. Each value is converted with Objects.toString() and prefixed with its length, and
+    the pieces are concatenated into a persistent AtomicReference, whose text is the result of
+    the program. Values can hold any character.
+    """
+    global _batch_handles
+    with _batch_lock:
+        if _batch_handles is None:
+            # JDK members are looked up by their own names, without lib_java's member map:
+            # on Fabric it maps Minecraft names such as "set" (KeyMapping.setKeyPressed)
+            atomic_ref = java_class("java.util.concurrent.atomic.AtomicReference")
+            string = java_class("java.lang.String")
+            _batch_handles = (
+                java_new_instance(java_ctor(atomic_ref)),
+                java_member(atomic_ref, "set"),
+                java_member(java_class("java.util.Objects"), "toString"),
+                java_member(string, "length"),
+                java_member(string, "concat"),
+                java_string(":"))
+        ref, set_method, to_string, length, concat, colon = _batch_handles
+        java_tasks = list(tasks)
+        joined = None
+        for value in values:
+            text = java_call_method.as_task(0, to_string, value)
+            text_length = java_call_method.as_task(text, length)
+            prefix = java_call_method.as_task(0, to_string, text_length)
+            prefix_colon = java_call_method.as_task(prefix, concat, colon)
+            piece = java_call_method.as_task(prefix_colon, concat, text)
+            java_tasks += [text, text_length, prefix, prefix_colon, piece]
+            if joined is not None:
+                piece = java_call_method.as_task(joined, concat, piece)
+                java_tasks.append(piece)
+            joined = piece
+        if joined is None:
+            return []
+        program = java_tasks + [java_call_method.as_task(ref, set_method, joined)]
+        program.append(java_release.as_task(*program))
+        program.append(java_to_string.as_task(ref))
+        return _split_batch(run_tasks(program))
+
+def _split_batch(text: str) -> list[str]:
+    """Splits the `<length>:<value>` pieces of a _read_batch() result. Lengths count UTF-16 units, as in Java."""
+    data = text.encode("utf-16-le", "surrogatepass")
+    values = []
+    pos = 0
+    while pos < len(data):
+        colon = data.index(b":\x00", pos)
+        start = colon + 2
+        end = start + 2 * int(data[pos:colon].decode("utf-16-le"))
+        values.append(data[start:end].decode("utf-16-le", "surrogatepass"))
+        pos = end
+    return values
+
+def _wait_tick() -> None:
+    """Blocks until the next game tick."""
+    with tick_loop:
+        screen_name()  # Any synchronous call on tick_loop completes on the next tick
+
 def _get_game_mode_name(c):
+    _init_mappings()
     if fabric:
         return c.method_8381()
     return c.getName()
 
+# # # TICK # # #
+
+@dataclass(frozen=True)
+class TickStats:
+    ticks: int              # Ticks observed by the clock
+    skipped: int            # Game ticks that passed without the clock observing them
+    mean_interval: float    # Average seconds between observed ticks
+    max_interval: float     # Longest seconds between two observed ticks
+    drift: float            # Seconds the observed ticks are behind (+) or ahead (-) of a steady 20 TPS
+
+class TickClock:
+    """
+    One shared game tick clock for every loop of the script.
+
+    A single background thread waits for each game tick and wakes everyone blocked in
+    wait_next_tick() or wait_ticks(), so any number of loops costs one tick_loop call per tick.
+    The thread idles when nobody has waited for `idle_after` seconds. Skipped ticks are counted
+    from World game time, falling back to the time between ticks outside of a world.
+
+    Example:
+        clock = TickClock.get()
+        while True:
+            clock.wait_next_tick()
+            ...
+    """
+    _instance: "TickClock | None" = None
+    _instance_lock = threading.Lock()
+    tick_length: float = 0.05
+    idle_after: float = 1.0
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._tick: int = 0
+        self._waiting: int = 0
+        self._last_used: float = monotonic()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future, int]] = []
+        self._last_time: float | None = None
+        self._last_game_time: int | None = None
+        self._intervals: int = 0
+        self._interval_sum: float = 0.0
+        self._max_interval: float = 0.0
+        self._skipped: int = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "TickClock":
+        """
+        Returns the shared TickClock.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = TickClock()
+            return cls._instance
+
+    @property
+    def tick(self) -> int:
+        """Number of ticks observed so far."""
+        return self._tick
+
+    @property
+    def running(self) -> bool:
+        """True while the clock observes ticks, False while it's idle."""
+        with self._cond:
+            return not self._idle()
+
+    def wait_until(self, tick: int, timeout: float | None = None, token: "CancelToken | None" = None) -> int:
+        """
+        Blocks until the clock reaches `tick`, or `timeout` seconds pass.
+
+        Args:
+            tick (int): Tick to wait for.
+            timeout (float | None, optional): Maximum seconds to wait. Defaults to None (no limit).
+            token (CancelToken | None, optional): Raises Cancelled as soon as this token is cancelled.
+
+        Returns:
+            int: The current tick.
+        """
+        if token is not None:
+            token.raise_if_cancelled()
+            token._wake_on_cancel(self._cond)  # pylint: disable=W0212
+        with self._cond:
+            self._waiting += 1
+            self._last_used = monotonic()
+            self._cond.notify_all()
+            try:
+                self._cond.wait_for(lambda: self._tick >= tick or (token is not None and token.cancelled), timeout)
+            finally:
+                self._waiting -= 1
+                self._last_used = monotonic()
+        if token is not None:
+            token.raise_if_cancelled()
+        return self._tick
+
+    def wait_ticks(self, ticks: int, timeout: float | None = None, token: "CancelToken | None" = None) -> int:
+        """
+        Blocks for `ticks` game ticks. Returns the current tick.
+        """
+        with self._cond:
+            return self.wait_until(self._tick + ticks, timeout, token)
+
+    def wait_next_tick(self, timeout: float | None = None, token: "CancelToken | None" = None) -> int:
+        """
+        Blocks until the next game tick. Returns the current tick.
+        """
+        return self.wait_ticks(1, timeout, token)
+
+    async def async_wait_ticks(self, ticks: int) -> int:
+        """
+        Same as wait_ticks(), without blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            self._async_waiters.append((loop, future, self._tick + ticks))
+            self._last_used = monotonic()
+            self._cond.notify_all()
+        return await future
+
+    async def async_wait_next_tick(self) -> int:
+        """
+        Same as wait_next_tick(), without blocking the event loop.
+        """
+        return await self.async_wait_ticks(1)
+
+    def stats(self) -> TickStats:
+        with self._cond:
+            mean = self._interval_sum / self._intervals if self._intervals else 0.0
+            observed = self._intervals + self._skipped
+            drift = self._interval_sum - observed * TickClock.tick_length
+            return TickStats(self._tick, self._skipped, mean, self._max_interval, drift)
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            self._intervals = 0
+            self._interval_sum = 0.0
+            self._max_interval = 0.0
+            self._skipped = 0
+
+    def _idle(self) -> bool:
+        return (not self._waiting and not self._async_waiters
+                and monotonic() - self._last_used > TickClock.idle_after)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._idle():
+                    # Ticks that pass while idle are neither observed nor skipped
+                    self._last_time = None
+                    self._last_game_time = None
+                    while self._idle():
+                        self._cond.wait(TickClock.idle_after)
+            try:
+                _wait_tick()
+            except Exception as e:
+                log(f"[TickClock] Error while waiting for a tick: {e}")
+                continue
+            now = monotonic()
+            game_time = TickClock._read_game_time()
+            with self._cond:
+                self._tick += 1
+                self._record(now, game_time)
+                self._cond.notify_all()
+                ready = [waiter for waiter in self._async_waiters if waiter[2] <= self._tick]
+                if ready:
+                    self._async_waiters = [waiter for waiter in self._async_waiters if waiter[2] > self._tick]
+            for loop, future, _ in ready:
+                loop.call_soon_threadsafe(TickClock._resolve, future, self._tick)
+
+    def _record(self, now: float, game_time: int | None) -> None:
+        if self._last_time is not None:
+            interval = now - self._last_time
+            self._intervals += 1
+            self._interval_sum += interval
+            self._max_interval = max(self._max_interval, interval)
+            if game_time is not None and self._last_game_time is not None:
+                self._skipped += max(game_time - self._last_game_time - 1, 0)
+            else:
+                self._skipped += max(round(interval / TickClock.tick_length) - 1, 0)
+        self._last_time = now
+        self._last_game_time = game_time
+
+    @staticmethod
+    def _read_game_time() -> int | None:
+        try:
+            return _java.mc.level.getGameTime()
+        except Exception:
+            return None
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, tick: int) -> None:
+        if not future.done():
+            future.set_result(tick)
+
+# # # CANCEL # # #
+
+class Cancelled(Exception):
+    """Raised by the waits of a CancelToken once it's cancelled."""
+
+class CancelToken:
+    """
+    Stops a long-running loop from another thread, a key or a chat message.
+
+    sleep(), wait_ticks(), wait_next_tick() and wait_for() return normally until the token is
+    cancelled, then raise Cancelled right away, even from the middle of a long wait. Cleanup
+    hooks added with on_cancel() run once, when the `with` block exits because the token was
+    cancelled or an exception escaped it, on the thread running the loop, so nothing the loop
+    does after cancel() can outlive them. They don't run when the block finishes normally,
+    e.g. through `break`. Leaving the `with` block through Cancelled is not an error.
+
+    Example:
+        with CancelToken().cancel_on_chat("stop") as token:
+            keys = KeyState.get()
+            token.on_cancel(keys.release_all)
+            while True:
+                keys.press("key.attack")
+                token.wait_ticks(20)
+    """
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._hooks: list[tuple[Callable[[], None], bool]] = []  # (hook, run on every exit)
+        self._conditions: list[threading.Condition] = []
+        self._cleaned_up: bool = False
+        self._aborted: bool = False  # The `with` block exited through cancellation or an exception
+        self.reason: str | None = None
+
+    def __enter__(self) -> "CancelToken":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        aborted = self._event.is_set() or exc_type is not None
+        self._event.set()  # Stops the key and chat watchers
+        self._run_hooks(aborted)
+        return exc_type is not None and issubclass(exc_type, Cancelled)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str | None = None) -> None:
+        """
+        Cancels the token and wakes every wait on it. The cleanup hooks run when the `with` block exits.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            conditions = list(self._conditions)
+        for cond in conditions:
+            with cond:
+                cond.notify_all()
+
+    def on_cancel(self, hook: Callable[[], None]) -> None:
+        """
+        Adds a cleanup hook, run if the `with` block exits through cancellation or an exception.
+        Hooks run in reverse order of addition; one added after such an exit runs right away.
+        """
+        self._add_hook(hook, False)
+
+    def _on_exit(self, hook: Callable[[], None]) -> None:
+        """Adds a cleanup hook that runs whenever the `with` block exits, for the token's own watchers."""
+        self._add_hook(hook, True)
+
+    def _add_hook(self, hook: Callable[[], None], always: bool) -> None:
+        with self._lock:
+            if not self._cleaned_up:
+                self._hooks.append((hook, always))
+                return
+            if not (always or self._aborted):
+                return
+        hook()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Same as time.sleep(), but raises Cancelled as soon as the token is cancelled.
+        """
+        if self._event.wait(seconds):
+            raise Cancelled(self.reason)
+
+    def wait_ticks(self, ticks: int) -> int:
+        """
+        Same as TickClock.wait_ticks(), but raises Cancelled as soon as the token is cancelled.
+        """
+        return TickClock.get().wait_ticks(ticks, token=self)
+
+    def wait_next_tick(self) -> int:
+        return TickClock.get().wait_next_tick(token=self)
+
+    def wait_for(self, condition: Callable[[], bool], timeout: float | None = None) -> bool:
+        """
+        Checks `condition` once per tick until it's true or `timeout` seconds pass.
+
+        Returns:
+            bool: True if the condition became true, False on timeout.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        clock = TickClock.get()
+        while not condition():
+            if deadline is not None and monotonic() >= deadline:
+                return False
+            clock.wait_next_tick(token=self)
+        return True
+
+    def cancel_on_key(self, key: int) -> "CancelToken":
+        """
+        Cancels the token when `key` (a GLFW key code) is pressed. Returns the token.
+        """
+        hub = InputHub.get()
+        binding = hub.bind_key(key, lambda: self.cancel(f"key {key}"), trigger="press")
+        self._on_exit(lambda: hub.unbind(binding))
+        return self
+
+    def cancel_on_chat(self, text: str) -> "CancelToken":
+        """
+        Cancels the token when a chat message containing `text` (case-insensitive) is received. Returns the token.
+        """
+        text = text.lower()
+        def watch():
+            with EventQueue() as event_queue:
+                event_queue.register_chat_listener()
+                while not self._event.is_set():
+                    try:
+                        event = event_queue.get(timeout=TickClock.tick_length)
+                    except Exception:
+                        continue
+                    if event.type == EventType.CHAT and text in event.message.lower():
+                        self.cancel(f"chat '{text}'")
+        threading.Thread(target=watch, daemon=True).start()
+        return self
+
+    def _wake_on_cancel(self, cond: threading.Condition) -> None:
+        with self._lock:
+            if cond not in self._conditions:
+                self._conditions.append(cond)
+
+    def _run_hooks(self, aborted: bool) -> None:
+        with self._lock:
+            if self._cleaned_up:
+                return
+            self._cleaned_up = True
+            self._aborted = aborted
+            hooks, self._hooks = [hook for hook, always in self._hooks[::-1] if always or aborted], []
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                log(f"[CancelToken] Error in cleanup hook: {e}")
+
 # # # INVENTORY # # #
 
+def _component_text(component: Any) -> str:
+    """Flattens a text component (JSON string, compound or list) into its plain text."""
+    if isinstance(component, str):
+        if component[:1] in ("{", "[", '"'):
+            try:
+                return _component_text(json.loads(component))
+            except ValueError:
+                pass
+        return component
+    if isinstance(component, dict):
+        text = str(component.get("text", ""))
+        return text + "".join(_component_text(c) for c in component.get("extra", ()))
+    if isinstance(component, list):
+        return "".join(_component_text(c) for c in component)
+    return "" if component is None else str(component)
+
+class InventoryIndex:
+    """
+    Index of an inventory or container snapshot that maps item ids and custom names to slots.
+
+    The index remembers the stamp it was built for; callers compare their current stamp with
+    is_current() and only fetch a new snapshot when it differs. Custom names are extracted lazily,
+    on the first lookup by name, and kept in a shared LRU cache keyed by NBT string.
+    """
+    _NAME_CACHE_SIZE = 1024
+    _name_cache: "OrderedDict[str, str | None]" = OrderedDict()  # NBT string -> custom name, shared by all indexes
+
+    def __init__(self) -> None:
+        self._stamp: Any = None
+        self._items: list[ItemStack] = []
+        self._by_item: dict[str, tuple[int, ...]] = {}
+        self._by_name: dict[tuple[str, str], tuple[int, ...]] | None = None
+
+    def is_current(self, stamp: Any) -> bool:
+        """
+        Returns True if the index was built for `stamp`.
+        """
+        return stamp is not None and stamp == self._stamp
+
+    def update(self, items: list[ItemStack], stamp: Any = None) -> None:
+        """
+        Rebuilds the index from a new snapshot.
+
+        Args:
+            items (list[ItemStack]): The snapshot.
+            stamp (Any, optional): Identifies the inventory state the snapshot was taken in. Defaults to None
+                (the index is never current).
+        """
+        self._stamp = stamp
+        self._items = items
+        by_item: dict[str, list[int]] = {}
+        for it in items:
+            by_item.setdefault(it.item, []).append(it.slot)
+        self._by_item = {item: tuple(slots) for item, slots in by_item.items()}
+        self._by_name = None
+
+    def invalidate(self) -> None:
+        """
+        Marks the index as stale, so the next lookup fetches a new snapshot.
+        """
+        self._stamp = None
+
+    def slots(self, item_id: str, cust_name: str = "") -> tuple[int, ...]:
+        """
+        Returns the slots holding `item_id`, restricted to stacks named `cust_name` if it's not empty.
+        """
+        if cust_name == "":
+            return self._by_item.get(item_id, ())
+        if self._by_name is None:
+            self._by_name = self._build_name_map()
+        return self._by_name.get((item_id, cust_name), ())
+
+    def first_slot(self, item_id: str, cust_name: str = "") -> int | None:
+        slots = self.slots(item_id, cust_name)
+        return slots[0] if slots else None
+
+    def _build_name_map(self) -> dict[tuple[str, str], tuple[int, ...]]:
+        by_name: dict[tuple[str, str], list[int]] = {}
+        for it in self._items:
+            name = InventoryIndex.custom_name(it.nbt)
+            if name is not None:
+                by_name.setdefault((it.item, name), []).append(it.slot)
+        return {key: tuple(slots) for key, slots in by_name.items()}
+
+    @staticmethod
+    def custom_name(nbt: str | None) -> str | None:
+        """
+        Returns the plain-text custom name stored in an item's NBT string, or None if it has none.
+        """
+        if not nbt or "minecraft:custom_name" not in nbt:
+            return None
+        cache = InventoryIndex._name_cache
+        if nbt in cache:
+            cache.move_to_end(nbt)
+            return cache[nbt]
+        name = lib_nbt.get_path(nbt, "components.minecraft:custom_name")
+        if name is not None:
+            name = _component_text(name)
+        cache[nbt] = name
+        if len(cache) > InventoryIndex._NAME_CACHE_SIZE:
+            cache.popitem(last=False)
+        return name
+
+class ClickEngine:
+    """
+    Sends container clicks with the Java handles of the current screen resolved only once.
+
+    The screen's container id, the game mode, the player and the handleInventoryMouseClick method
+    are looked up when the engine is created. The engine is keyed on the identities of the open
+    screen, the player and the game mode, which are read together in one task program per lookup:
+    the player inventory always has container id 0, so a respawn, dimension change or reconnect
+    would otherwise keep the old player's handles. The engine is dropped when the screen closes or
+    Screen.wait_screen()/close_screen() invalidates it. A list of clicks is sent as one task program
+    on render_loop, optionally split into batches of `clicks_per_tick`.
+    """
+    _current: "ClickEngine | None" = None
+    _click_types: dict[str, Any] = {}  # ClickType name -> enum constant
+    _key_members: tuple[int, int, int, int] | None = None  # Field and method ids read by ClickEngine.__read_key()
+
+    def __init__(self, screen, name: str, key: tuple[int, ...] = ()) -> None:
+        self.screen_name: str = name
+        self.key: tuple[int, ...] = key
+        self.container_id: int = screen.getMenu().containerId
+        self._game_mode = _java.mc.gameMode
+        self._player = _java.mc.player
+        from lib_java import find_java_member
+        self._click_method = find_java_member(self._game_mode.get_class_id(), "handleInventoryMouseClick")
+        self._int_handles: dict[int, int] = {}  # Python int -> Java Integer handle
+        self._container_id_handle = self._java_int(self.container_id)
+
+    @staticmethod
+    def __read_key() -> tuple[int, ...]:
+        """
+        Returns the identity hashes of mc.screen, mc.player and mc.gameMode, 0 for null, read in one task program.
+        """
+        members = ClickEngine._key_members
+        if members is None:
+            from lib_java import find_java_member
+            mc_class = _java.mc.get_class_id()
+            members = ClickEngine._key_members = (
+                find_java_member(mc_class, "screen"),
+                find_java_member(mc_class, "player"),
+                find_java_member(mc_class, "gameMode"),
+                # A JDK method, looked up without the Fabric member map
+                java_member(java_class("java.lang.System"), "identityHashCode"))
+        *fields, identity_hash = members
+        handles = [java_access_field.as_task(_java.mc.id, field) for field in fields]
+        values = [java_call_method.as_task(0, identity_hash, handle) for handle in handles]
+        return tuple(int(value) for value in _read_batch(handles + values, values))
+
+    @classmethod
+    def current(cls) -> "ClickEngine | None":
+        """
+        Returns the click engine for the currently open screen, or None if no screen is open.
+        """
+        key = ClickEngine.__read_key()
+        if key[0] == 0:  # No screen open
+            cls.invalidate()
+            return None
+        # Every opened screen is a new object, so two screens with the same title don't share an engine
+        engine = cls._current
+        if engine is not None and engine.key == key:
+            return engine
+        cls.invalidate()
+        screen = _java.mc.screen
+        name = screen_name()
+        if screen is None or name is None:
+            return None
+        cls._current = ClickEngine(screen, name, key)
+        return cls._current
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Drops the cached engine, so the next click resolves the screen's handles again.
+        """
+        Inventory.invalidate()
+        if cls._current is not None:
+            cls._current.release()
+            cls._current = None
+
+    @staticmethod
+    def click_type(name: str):
+        click_type = ClickEngine._click_types.get(name)
+        if click_type is None:
+            click_type = ClickEngine._click_types[name] = getattr(_java.ClickType, name)
+        return click_type
+
+    def _java_int(self, value: int) -> int:
+        handle = self._int_handles.get(value)
+        if handle is None:
+            handle = self._int_handles[value] = java_int(value)
+        return handle
+
+    def click_task(self, slot: int, button: int = 0, click_type: str = "PICKUP") -> Task:
+        """
+        Returns a task that performs one click, without running it.
+        """
+        # handleInventoryMouseClick(int syncId, int slotId, int button, ClickType arg3, Player arg4)
+        return java_call_method.as_task(
+            self._game_mode.id, self._click_method, self._container_id_handle, self._java_int(slot),
+            self._java_int(button), ClickEngine.click_type(click_type).id, self._player.id)
+
+    def submit(self, clicks: list[tuple[int, int, str]], clicks_per_tick: int | None = None) -> None:
+        """
+        Performs a list of clicks on render_loop.
+
+        Args:
+            clicks (list[tuple[int, int, str]]): (slot, button, ClickType name) for each click.
+            clicks_per_tick (int | None, optional): If set, sends at most this many clicks per game tick. 
+                Defaults to None (all in one task program).
+        """
+        if not clicks:
+            return
+        if clicks_per_tick is None or clicks_per_tick >= len(clicks):
+            self._run_batch(clicks, render_loop)
+            return
+        # Each synchronous call on tick_loop runs within its own game tick
+        for i in range(0, len(clicks), clicks_per_tick):
+            self._run_batch(clicks[i:i + clicks_per_tick], tick_loop)
+
+    def _run_batch(self, clicks: list[tuple[int, int, str]], executor) -> None:
+        tasks = [self.click_task(*click) for click in clicks]
+        tasks.append(java_release.as_task(*tasks))
+        with executor:
+            run_tasks(tasks)
+        Inventory.invalidate()
+
+    def release(self) -> None:
+        if self._int_handles:
+            java_release(*self._int_handles.values())
+            self._int_handles.clear()
+
 class Inventory:
+    _generation: int = 0  # bumped by Inventory.invalidate()
+    _stamp_members: dict[bool, tuple] = {}  # container flag -> member ids read by Inventory.__read_stamp()
+    _player_index: InventoryIndex = InventoryIndex()
+    _container_index: InventoryIndex = InventoryIndex()
+
     @staticmethod
     def click_slot(slot: int, right_button: bool=False) -> bool:
         """
@@ -390,15 +1360,12 @@ class Inventory:
         Returns:
             bool: True if the click was performed successfully, False if no screen is open.
         """
-        screen = mc.screen
-        if screen is None:
+        engine = ClickEngine.current()
+        if engine is None:
             return False
 
-        container_menu = screen.getMenu()
         mouse_button = 1 if right_button else 0
-        # handleInventoryMouseClick(int syncId, int slotId, int button, ClickType arg3, Player arg4)
-        mc.gameMode.handleInventoryMouseClick(
-            container_menu.containerId, slot, mouse_button, ClickType.PICKUP, mc.player)
+        engine.submit([(slot, mouse_button, "PICKUP")])
 
         return True
 
@@ -414,15 +1381,11 @@ class Inventory:
             This function interacts with the Minecraft game mode to perform a QUICK_MOVE (shift-click)
             action on the given slot. If there is no active screen, the function returns False.
         """
-        screen = mc.screen
-        if screen is None:
+        engine = ClickEngine.current()
+        if engine is None:
             return False
 
-        container_menu = screen.getMenu()
-        mouse_button = 0
-        # handleInventoryMouseClick(int syncId, int slotId, int button, ClickType arg3, Player arg4)
-        mc.gameMode.handleInventoryMouseClick(
-            container_menu.containerId, slot, mouse_button, ClickType.QUICK_MOVE, mc.player)
+        engine.submit([(slot, 0, "QUICK_MOVE")])
 
         return True
 
@@ -438,14 +1401,11 @@ class Inventory:
         Notes:
             This function interacts with the Minecraft client to perform the swap using the SWAP click type.
         """
-        screen = mc.screen
-        if screen is None:
+        engine = ClickEngine.current()
+        if engine is None:
             return False
 
-        container_menu = screen.getMenu()
-        # handleInventoryMouseClick(int syncId, int slotId, int button, ClickType arg3, Player arg4)
-        mc.gameMode.handleInventoryMouseClick(
-            container_menu.containerId, inv_slot, hotbar_slot, ClickType.SWAP, mc.player)
+        engine.submit([(inv_slot, hotbar_slot, "SWAP")])
 
         return True
 
@@ -468,24 +1428,21 @@ class Inventory:
         return r
 
     @staticmethod
-    def take_items(slots: list[int]) -> bool:
+    def take_items(slots: list[int], clicks_per_tick: int | None = None) -> bool:
         """
         Transfers items from the specified inventory slots to the player's inventory using quick move.
         Args:
             slots (list[int]): A list of slot indices to move items from.
+            clicks_per_tick (int | None, optional): If set, moves at most this many slots per game tick, 
+                so servers with click rate limits don't kick the player. Defaults to None (no limit).
         Returns:
             bool: True if the operation was performed, False if no screen is open.
         """
-        screen = mc.screen
-        if screen is None:
+        engine = ClickEngine.current()
+        if engine is None:
             return False
 
-        container_menu = screen.getMenu()
-        mouse_button = 0
-        for slot in slots:
-            # handleInventoryMouseClick(int syncId, int slotId, int button, ClickType arg3, Player arg4)
-            mc.gameMode.handleInventoryMouseClick(
-                container_menu.containerId, slot, mouse_button, ClickType.QUICK_MOVE, mc.player)
+        engine.submit([(slot, 0, "QUICK_MOVE") for slot in slots], clicks_per_tick)
 
         return True
 
@@ -512,34 +1469,71 @@ class Inventory:
                 then the hotbar slots IDs will be from 0+54=54 to 8+54=62, and the main inventory will be from 9+54=63 
                 to 35+54=89.
         """
-        if not container:
-            items: list[ItemStack] = player_inventory()
-        else:
-            if try_open:
-                if not Inventory.open_targeted_chest():
-                    return None
-            items: list[ItemStack] = container_get_items()
-            if try_open:
-                Screen.close_screen()
-        if items is None:
-            #return None
-            raise Exception("Error: You need an open container.") # pylint: disable=W0719
-        
-        fi = filter(lambda x: x.item == item_id, items)
-        if cust_name == "":
-            try:
-                return next(fi).slot
-            except StopIteration:
-                return None
+        index = Inventory._container_index if container else Inventory._player_index
+        # The snapshot is reused until the menu's state id changes (every slot update from the server
+        # increments it, pickups included) or a click or screen change invalidates it
+        stamp = None if try_open else Inventory.__read_stamp(container)
+        if try_open or not index.is_current(stamp):
+            if not container:
+                items: list[ItemStack] = player_inventory()
+            else:
+                if try_open:
+                    if not Inventory.open_targeted_chest():
+                        return None
+                items: list[ItemStack] = container_get_items()
+                if try_open:
+                    Screen.close_screen()
+            if items is None:
+                #return None
+                raise Exception("Error: You need an open container.") # pylint: disable=W0719
+            index.update(items, stamp)
+        return index.first_slot(item_id, cust_name)
 
-        for it in fi:
-            nbt: dict = lib_nbt.parse_snbt(it.nbt)
-            if "components" in nbt:
-                comp = nbt.get("components")
-                if "minecraft:custom_name" in comp:  # type: ignore
-                    return it.slot
+    @staticmethod
+    def __read_stamp(container: bool) -> tuple[int, int, int] | None:
+        """
+        Returns the identity and state id of the player's inventory menu, or of the open screen's menu
+        if `container` is True, read in one task program, with Inventory._generation.
+        Returns None if there's no such menu.
+        """
+        members = Inventory._stamp_members.get(container)
+        if members is None:
+            from lib_java import find_java_member
+            mc = _java.mc
+            if container:
+                screen = mc.screen
+                if screen is None:
+                    return None
+                members = (find_java_member(mc.get_class_id(), "screen"), find_java_member(screen.get_class_id(), "getMenu"))
+                menu = screen.getMenu()
+            else:
+                player = mc.player
+                members = (find_java_member(mc.get_class_id(), "player"), find_java_member(player.get_class_id(), "inventoryMenu"))
+                menu = player.inventoryMenu
+            members = Inventory._stamp_members[container] = members + (
+                find_java_member(menu.get_class_id(), "getStateId"),
+                # A JDK method, looked up without the Fabric member map
+                java_member(java_class("java.lang.System"), "identityHashCode"))
+        mc_field, menu_member, get_state_id, identity_hash = members
+        owner = java_access_field.as_task(_java.mc.id, mc_field)
+        if container:
+            menu = java_call_method.as_task(owner, menu_member)
+        else:
+            menu = java_access_field.as_task(owner, menu_member)
+        values = [java_call_method.as_task(0, identity_hash, menu), java_call_method.as_task(menu, get_state_id)]
+        try:
+            identity, state_id = _read_batch([owner, menu] + values, values)
+        except Exception:  # No screen, or one without a menu
+            return None
+        return int(identity), int(state_id), Inventory._generation
 
-        return None
+    @staticmethod
+    def invalidate() -> None:
+        """
+        Marks the cached inventory and container snapshots used by find_item() as stale.
+        Called after clicks and screen changes; call it after changing the inventory by other means.
+        """
+        Inventory._generation += 1
 
     @staticmethod
     def count_total(inventory: list[ItemStack], item_id: int) -> int:
@@ -558,6 +1552,8 @@ class Inventory:
 # # # SCREEN # # #
 with render_loop:
     class Screen:
+        last_wait_ms: float | None = None  # Time the last successful wait_screen() took, in milliseconds
+
         @staticmethod
         def wait_screen(name: str = "", delay: int = 500) -> bool:
             """
@@ -571,18 +1567,35 @@ with render_loop:
                 bool: True if the specified screen name (or any screen if name is empty) is detected 
                 within the wait period, False otherwise.
             """
-            w = 0.05
-            i: int = int(delay * w) or 1
-            for _ in range(i):
-                scn_name = screen_name()
-                if scn_name is not None:
-                    if name == "":
-                        return True
-                    elif scn_name == name:
-                        return True
-                sleep(w)
+            return Screen.wait_screen_ms(name, delay) is not None
 
-            return False
+        @staticmethod
+        def wait_screen_ms(name: str = "", delay: int = 500) -> float | None:
+            """
+            Same as wait_screen(), but returns how long the screen took to open.
+            The screen name is polled once per rendered frame until `delay` milliseconds have passed.
+
+            Args:
+                name (str, optional): The name of the screen to wait for. If empty, waits for any screen. Defaults to "".
+                delay (int, optional): The maximum time to wait for the screen name in milliseconds. Defaults to 500.
+
+            Returns:
+                float | None: Milliseconds elapsed until the screen was detected, or None if it didn't open in time.
+                The last successful value is also stored in Screen.last_wait_ms.
+            """
+            ClickEngine.invalidate()
+            start = monotonic()
+            deadline = start + delay / 1000
+            while True:
+                # Each synchronous call on render_loop completes on the next rendered frame
+                with render_loop:
+                    scn_name = screen_name()
+                now = monotonic()
+                if scn_name is not None and (name == "" or scn_name == name):
+                    Screen.last_wait_ms = (now - start) * 1000
+                    return Screen.last_wait_ms
+                if now >= deadline:
+                    return None
 
         @staticmethod
         def close_screen() -> None:
@@ -591,7 +1604,8 @@ with render_loop:
             Returns:
                 None
             """
-            screen = mc.screen
+            ClickEngine.invalidate()
+            screen = _java.mc.screen
             if screen is not None:
                 # keyPressed(int keyCode, int scanCode, int modifiers)
                 screen.keyPressed(256, 0, 0)  # 256 is key code for escape key.
@@ -607,7 +1621,7 @@ with render_loop:
             Returns:
                 str or None: The title, or None if not available.
             """
-            subtitle = _get_private_field(mc.gui, "subtitle")
+            subtitle = _get_private_field(_java.mc.gui, "subtitle")
             if subtitle is not None:
                 # subtitle = subtitle.getString()
                 subtitle = subtitle.tryCollapseToString()
@@ -621,11 +1635,11 @@ with render_loop:
             Returns:
                 str or None: The subtitle, or None if not available.
             """
-            overlayMessageString = _get_private_field(mc.gui, "overlayMessageString")
+            overlayMessageString = _get_private_field(_java.mc.gui, "overlayMessageString")
             if overlayMessageString is not None:
                 # overlayMessageString = overlayMessageString.getString()
                 overlayMessageString = overlayMessageString.tryCollapseToString()
-                mc.gui.setOverlayMessage(None, False)
+                _java.mc.gui.setOverlayMessage(None, False)
             return overlayMessageString  # type: ignore
 
         @staticmethod
@@ -636,11 +1650,11 @@ with render_loop:
             Returns:
                 str or None: The current overlay message string if present, otherwise None.
             """
-            overlayMessageString = _get_private_field(mc.gui, "overlayMessageString")
+            overlayMessageString = _get_private_field(_java.mc.gui, "overlayMessageString")
             if overlayMessageString is not None:
                 # overlayMessageString = overlayMessageString.getString()
                 overlayMessageString = overlayMessageString.tryCollapseToString()
-                mc.gui.setOverlayMessage(None, False)
+                _java.mc.gui.setOverlayMessage(None, False)
             return overlayMessageString  # type: ignore
 
         @staticmethod
@@ -654,7 +1668,7 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.setTitle(Component.literal(text))
+            _java.mc.gui.setTitle(_java.Component.literal(text))
 
         @staticmethod
         def set_subtitle(text: str) -> None:
@@ -667,7 +1681,7 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.setSubtitle(Component.literal(text))
+            _java.mc.gui.setSubtitle(_java.Component.literal(text))
 
         @staticmethod
         def set_actionbar(text: str, tinted: bool = False) -> None:
@@ -680,7 +1694,7 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.setOverlayMessage(Component.literal(text), tinted)
+            _java.mc.gui.setOverlayMessage(_java.Component.literal(text), tinted)
 
         @staticmethod
         def set_title_times(fadeInTicks: int, stayTicks: int, fadeOutTicks: int) -> None:
@@ -695,7 +1709,7 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.setTimes(fadeInTicks, stayTicks, fadeOutTicks)
+            _java.mc.gui.setTimes(fadeInTicks, stayTicks, fadeOutTicks)
 
         @staticmethod
         def reset_title_times() -> None:
@@ -705,7 +1719,7 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.resetTitleTimes()
+            _java.mc.gui.resetTitleTimes()
 
         @staticmethod
         def clear_titles() -> None:
@@ -715,24 +1729,204 @@ with render_loop:
             Returns:
                 None
             """
-            mc.gui.clearTitles()
+            _java.mc.gui.clearTitles()
     # End render_loop
 
+GuiChannel = Literal["title", "subtitle", "actionbar"]
+
+@dataclass(frozen=True)
+class CapturedMessage:
+    seq: int               # Position in the capture stream, consecutive for every stored message
+    channel: GuiChannel
+    text: str | None
+    tick: int | None       # Game time when the message was first seen
+
+class GuiCapture:
+    """
+    Captures every title, subtitle and actionbar message without clearing them from the screen.
+
+    A background thread samples the three Gui fields once per game tick. A message is stored
+    when the field holds a new Component object, so a message that is sent again with the same
+    text is still captured once per send. Messages are kept in a bounded ring buffer and read
+    with cursors: read(cursor) returns everything stored from `cursor` on and the cursor to
+    use next time, so a consumer never sees the same message twice. If a consumer falls more
+    than `capacity` messages behind, the oldest ones are dropped, which shows up as a gap in
+    the `seq` numbers.
+
+    Example:
+        capture = GuiCapture.get()
+        cursor = capture.cursor()
+        while True:
+            messages, cursor = capture.wait(cursor)
+            for msg in messages:
+                if msg.channel == "actionbar":
+                    print(msg.tick, msg.text)
+    """
+    _instance: "GuiCapture | None" = None
+    _instance_lock = threading.Lock()
+    _FIELDS: dict[GuiChannel, str] = {
+        "title": "title",
+        "subtitle": "subtitle",
+        "actionbar": "overlayMessageString"
+    }
+
+    def __init__(self, capacity: int = 256) -> None:
+        self._buffer: deque[CapturedMessage] = deque(maxlen=capacity)
+        self._next_seq: int = 0
+        self._cond = threading.Condition()
+        self._running: bool = False
+        self._thread: threading.Thread | None = None
+        self._last_ids: dict[GuiChannel, int] = {channel: 0 for channel in GuiCapture._FIELDS}
+
+    @classmethod
+    def get(cls, capacity: int = 256) -> "GuiCapture":
+        """
+        Returns the shared GuiCapture, starting it on first use.
+
+        Args:
+            capacity (int, optional): Ring buffer size, only used when the capture is created. Defaults to 256.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = GuiCapture(capacity)
+                cls._instance.start()
+            return cls._instance
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops capturing and waits for the capture thread to exit, so start() never runs two of them.
+        """
+        self._running = False
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+
+    def cursor(self) -> int:
+        """
+        Returns a cursor positioned after the newest stored message, to read only messages captured from now on.
+        """
+        with self._cond:
+            return self._next_seq
+
+    def read(self, cursor: int = 0) -> tuple[list[CapturedMessage], int]:
+        """
+        Returns the stored messages with seq >= cursor, and the cursor to pass on the next call.
+        """
+        with self._cond:
+            first = self._next_seq - len(self._buffer)
+            skip = max(cursor - first, 0)
+            return list(islice(self._buffer, skip, None)), self._next_seq
+
+    def wait(self, cursor: int, timeout: float | None = None) -> tuple[list[CapturedMessage], int]:
+        """
+        Same as read(), but blocks until at least one message newer than `cursor` is stored, or `timeout` seconds pass.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_seq > cursor, timeout)
+        return self.read(cursor)
+
+    def _capture_loop(self) -> None:
+        from lib_java import JavaObject, find_java_class, find_java_member, java_member_map
+        gui = _java.mc.gui
+        get_field = find_java_member(find_java_class("java.lang.reflect.Field"), "get")
+        fields = {}
+        for channel, name in GuiCapture._FIELDS.items():
+            field = gui.getClass().getDeclaredField(java_member_map.get(name, name))
+            field.setAccessible(True)
+            fields[channel] = field
+
+        clock = TickClock.get()
+        while self._running:
+            clock.wait_next_tick(timeout=1.0)  # Bounded, so stop() returns even while no ticks pass
+            if not self._running:
+                break
+            try:
+                for channel, field in fields.items():
+                    component = java_call_method(field.id, get_field, gui.id)
+                    component_id = _identity_hash(component)
+                    if component_id == self._last_ids[channel]:
+                        java_release(component)
+                        continue
+                    self._last_ids[channel] = component_id
+                    if component_id == 0:  # Field was cleared
+                        java_release(component)
+                        continue
+                    text = JavaObject(component).tryCollapseToString()
+                    self._store(channel, text)
+            except Exception as e:
+                log(f"[GuiCapture] Error while sampling: {e}")
+
+    def _store(self, channel: GuiChannel, text: str | None) -> None:
+        try:
+            tick = World.get_game_time()
+        except Exception:
+            tick = None
+        with self._cond:
+            self._buffer.append(CapturedMessage(self._next_seq, channel, text, tick))
+            self._next_seq += 1
+            self._cond.notify_all()
+
 # # # KEY # # #
 
 class Key:
+    _keys: dict[str, Any] = {}                # key name -> InputConstants.Key
+    _keys_by_code: dict[tuple[int, bool], Any] = {}  # (code, mouse) -> InputConstants.Key
+    _press_members: tuple | None = None       # KeyMapping.click, KeyMapping.set
+
     @staticmethod
-    def __get_key_code(key_name: str):
-        try:
-            return InputConstants.getKey(key_name)
-        except Exception:
-            return InputConstants.UNKNOWN_KEY
+    def get_key(key_name: str):
+        """
+        Returns the InputConstants.Key for a key name like "key.keyboard.w", resolved once and cached.
+        """
+        key = Key._keys.get(key_name)
+        if key is None:
+            try:
+                key = _java.InputConstants.getKey(key_name)
+            except Exception:
+                key = _java.InputConstants.UNKNOWN
+            Key._keys[key_name] = key
+        return key
+
+    @staticmethod
+    def get_key_from_code(code: int, mouse: bool = False):
+        """
+        Returns the InputConstants.Key for a GLFW key code, or a mouse button if `mouse` is True, resolved once and cached.
+        """
+        key = Key._keys_by_code.get((code, mouse))
+        if key is None:
+            input_type = _java.InputType.MOUSE if mouse else _java.InputType.KEYSYM
+            key = Key._keys_by_code[(code, mouse)] = input_type.getOrCreate(code)
+        return key
 
     @staticmethod
     def __press_keybind(keybind, state: bool):
         if state:
-            KeyMapping.click(keybind)
-        KeyMapping.set(keybind, state)
+            _java.KeyMapping.click(keybind)
+        _java.KeyMapping.set(keybind, state)
+
+    @staticmethod
+    def press_tasks(key, state: bool) -> list[Task]:
+        """
+        Returns the tasks that press or release `key` (an InputConstants.Key), without running them.
+        """
+        if Key._press_members is None:
+            from lib_java import find_java_member
+            class_id = _java.KeyMapping.id
+            Key._press_members = (find_java_member(class_id, "click"), find_java_member(class_id, "set"))
+        click, set_ = Key._press_members
+        tasks = []
+        if state:
+            tasks.append(java_call_method.as_task(0, click, key.id))
+        tasks.append(java_call_method.as_task(0, set_, key.id, _java_bool(state)))
+        return tasks
 
     @staticmethod
     def press_key(key_name: str, state: bool):
@@ -749,15 +1943,496 @@ class Key:
         Returns:
             None
         """
-        keybind = Key.__get_key_code(key_name)
+        keybind = Key.get_key(key_name)
         Key.__press_keybind(keybind, state)
 
+class KeyState:
+    """
+    Tracks the intended state of key bindings ("key.forward", "key.attack", ...) and only sends changes.
+
+    set() just records the state; a background thread sends every binding whose state differs from
+    what was last sent, in one batch on the next game tick. Setting a key to the state it already
+    has costs nothing, and setting it several times within a tick only sends the final state.
+    tap() presses and releases a binding within the same batch, for keys that act on each press.
+
+    All held keys are released when the `with` block exits, and again when the script exits
+    normally; exit hooks don't run when a job is killed. KeyState only knows about the presses
+    it sent itself, release_keys() releases bindings unconditionally.
+
+    Example:
+        with KeyState.get() as keys:
+            keys.set("key.sneak", True)
+            while ...:
+                keys.set("key.right", dx > 0)
+                keys.set("key.left", dx < 0)
+    """
+    _instance: "KeyState | None" = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._intended: dict[str, bool] = {}
+        self._sent: dict[str, bool] = {}
+        self._taps: list[str] = []
+        self._cond = threading.Condition()
+        # Held from reading the state to send until it's sent, so sends can't overtake each other
+        self._send_lock = threading.Lock()
+        self._dirty: bool = False
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "KeyState":
+        """
+        Returns the shared KeyState, registering its release-all exit hook on first use.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = KeyState()
+                atexit.register(cls._instance.release_all)
+            return cls._instance
+
+    def __enter__(self) -> "KeyState":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release_all()
+
+    def set(self, key_name: str, state: bool) -> None:
+        """
+        Sets the intended state of a key binding. The change is sent on the next tick, if any.
+        """
+        with self._cond:
+            if self._intended.get(key_name, False) == state:
+                return
+            self._intended[key_name] = state
+            self._dirty = True
+            self._cond.notify()
+
+    def press(self, key_name: str) -> None:
+        self.set(key_name, True)
+
+    def release(self, key_name: str) -> None:
+        self.set(key_name, False)
+
+    def tap(self, key_name: str) -> None:
+        """
+        Presses and releases a key binding in the next batch, leaving its intended state unchanged.
+        """
+        with self._cond:
+            self._taps.append(key_name)
+            self._dirty = True
+            self._cond.notify()
+
+    def is_pressed(self, key_name: str) -> bool:
+        return self._intended.get(key_name, False)
+
+    def release_all(self) -> None:
+        """
+        Releases every pressed key binding and sends the releases right away.
+        """
+        with self._cond:
+            for key_name in self._intended:
+                self._intended[key_name] = False
+        self.flush()
+
+    def release_keys(self, key_names: list[str]) -> None:
+        """
+        Releases key bindings right away, whether KeyState pressed them or not.
+        Use it to make sure keys pressed by other means, or left held by a killed job, are up.
+        """
+        with self._send_lock:
+            with self._cond:
+                for key_name in key_names:
+                    self._intended[key_name] = False
+                    self._sent[key_name] = False
+            if key_names:
+                with render_loop:
+                    run_tasks([press_key_bind.as_task(name, False) for name in key_names])
+
+    def flush(self) -> None:
+        """
+        Sends the pending changes now instead of waiting for the next tick.
+        """
+        with self._send_lock:
+            with self._cond:
+                changes = [(name, state) for name, state in self._intended.items() if self._sent.get(name, False) != state]
+                taps, self._taps = self._taps, []
+                self._sent.update(changes)
+                self._dirty = False
+            tasks = []
+            for name in taps:
+                tasks.append(press_key_bind.as_task(name, True))
+                tasks.append(press_key_bind.as_task(name, False))
+            tasks.extend(press_key_bind.as_task(name, state) for name, state in changes)
+            if tasks:
+                with render_loop:
+                    run_tasks(tasks)
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty)
+            TickClock.get().wait_next_tick()
+            try:
+                self.flush()
+            except Exception as e:
+                log(f"[KeyState] Error while sending keys: {e}")
+
+@dataclass(frozen=True)
+class GovernorStats:
+    action: str
+    requested: int          # acquire() calls
+    granted: int            # acquire() calls that returned
+    throttled: int          # acquire() calls that had to wait
+    waited: float           # Seconds spent waiting in acquire()
+    demand_rate: float      # Actions per second the caller asked for, not counting time spent waiting
+    achieved_rate: float    # Actions per second actually granted
+
+class _ActionLimit:
+    def __init__(self, per_tick: int | None, per_second: float | None, burst: float | None) -> None:
+        self.per_tick: int | None = per_tick
+        self.per_second: float | None = per_second
+        self.capacity: float = burst if burst is not None else max(1.0, (per_second or 0) / 20)
+        self.tokens: float = self.capacity
+        self.refilled_at: float = monotonic()
+        self.tick: int = -1
+        self.tick_used: int = 0
+        self.first: float | None = None
+        self.requested: int = 0
+        self.granted: int = 0
+        self.throttled: int = 0
+        self.waited: float = 0.0
+
+    def reserve(self, now: float, tick: int) -> float | None:
+        """Takes one action if allowed: returns 0, the seconds to wait for a token, or None to wait for the next tick."""
+        if self.tick != tick:
+            self.tick = tick
+            self.tick_used = 0
+        if self.per_tick is not None and self.tick_used >= self.per_tick:
+            return None
+        if self.per_second is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.per_second)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.per_second
+            self.tokens -= 1
+        self.tick_used += 1
+        return 0
+
+class RateGovernor:
+    """
+    Caps how often each class of action ("orientation", "click", "drop", ...) may run.
+
+    acquire(action) blocks until the action is allowed under its limit: a number of actions
+    per game tick, a number per second (a token bucket holding `burst` actions), or both.
+    Actions without a limit are allowed once per tick, the highest rate the game processes
+    most inputs at. Callers sleep while they wait, so a paced loop no longer burns a CPU core.
+    stats() reports the rate callers asked for next to the rate they were granted.
+
+    Example:
+        governor = RateGovernor.get()
+        governor.limit("orientation", per_tick=1)
+        while True:
+            governor.acquire("orientation")
+            player_set_orientation(yaw, 0)
+    """
+    _instance: "RateGovernor | None" = None
+    _instance_lock = threading.Lock()
+    tick_length: float = 0.05   # Assume a new tick after this long while the TickClock isn't running
+
+    def __init__(self) -> None:
+        self._limits: dict[str, _ActionLimit] = {}
+        self._cond = threading.Condition()
+        self._tick: int = 0
+        self._tick_start: float = monotonic()
+        self._clock_tick: int = -1
+
+    @classmethod
+    def get(cls) -> "RateGovernor":
+        """
+        Returns the shared RateGovernor.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = RateGovernor()
+            return cls._instance
+
+    def limit(self, action: str, per_tick: int | None = 1, per_second: float | None = None, burst: float | None = None) -> None:
+        """
+        Sets the limit of an action class, resetting its stats.
+
+        Args:
+            action (str): Name of the action class.
+            per_tick (int | None, optional): Actions allowed per game tick, None for no per-tick cap. Defaults to 1.
+            per_second (float | None, optional): Actions allowed per second, None for no per-second cap. Defaults to None.
+            burst (float | None, optional): Actions that may run back to back under the per-second cap.
+                Defaults to one tick's worth.
+        """
+        if per_tick is None and per_second is None:
+            raise ValueError("[RateGovernor] A limit needs per_tick, per_second or both.")
+        with self._cond:
+            self._limits[action] = _ActionLimit(per_tick, per_second, burst)
+            self._cond.notify_all()
+
+    def acquire(self, action: str) -> float:
+        """
+        Blocks until `action` may run, and counts it.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        start = monotonic()
+        with self._cond:
+            limit = self._limits.get(action)
+            if limit is None:
+                limit = self._limits[action] = _ActionLimit(1, None, None)
+            if limit.first is None:
+                limit.first = start
+            limit.requested += 1
+            blocked = False
+            while True:
+                now = monotonic()
+                self._update_tick(now)
+                wait = limit.reserve(now, self._tick)
+                if wait == 0:
+                    break
+                blocked = True
+                if wait is not None:
+                    self._cond.wait(wait)
+                else:
+                    self._cond.release()
+                    try:
+                        TickClock.get().wait_next_tick()
+                    finally:
+                        self._cond.acquire()
+            waited = monotonic() - start
+            limit.granted += 1
+            if blocked:
+                limit.throttled += 1
+            limit.waited += waited
+            return waited
+
+    def stats(self, action: str) -> GovernorStats:
+        """
+        Returns the counters of an action class since its limit was set or it was first acquired.
+        """
+        with self._cond:
+            limit = self._limits.get(action)
+            if limit is None or limit.first is None:
+                return GovernorStats(action, 0, 0, 0, 0.0, 0.0, 0.0)
+            elapsed = max(monotonic() - limit.first, 1e-9)
+            busy = max(elapsed - limit.waited, 1e-9)
+            return GovernorStats(action, limit.requested, limit.granted, limit.throttled, limit.waited,
+                                 limit.requested / busy, limit.granted / elapsed)
+
+    def _update_tick(self, now: float) -> None:
+        """
+        Starts a new tick when the TickClock observed one, or after tick_length seconds if it isn't running.
+        Only one of the two advances the tick, so waking up on a clock tick never counts twice.
+        """
+        clock = TickClock._instance  # pylint: disable=W0212
+        if clock is not None and clock.running:
+            tick = clock.tick
+            if tick != self._clock_tick:  # The first caller to see this tick starts it
+                self._clock_tick = tick
+                self._next_tick(now)
+        elif now - self._tick_start >= RateGovernor.tick_length:
+            self._next_tick(now)
+
+    def _next_tick(self, now: float) -> None:
+        self._tick += 1
+        self._tick_start = now
+        self._cond.notify_all()
+
+# # # MACRO # # #
+
+MacroActionKind = Literal["key_bind", "key", "key_code", "orientation", "look_at", "use", "attack", "select_slot", "call"]
+
+class Macro:
+    """
+    Timeline of input actions played back with game tick accuracy.
+
+    Actions are placed on ticks with wait()/at() and compiled into one task batch per tick.
+    play() sends each batch with a single run_tasks call on tick_loop, so every batch runs on its
+    own consecutive game tick, no matter how loaded the system is. Keys are resolved once.
+
+    Example:
+        Macro().use(True).orientation(0, 50).wait(4).orientation(90, 50).wait(4).use(False).play()
+    """
+    def __init__(self) -> None:
+        self._timeline: dict[int, list[tuple[MacroActionKind, tuple]]] = {}
+        self._tick: int = 0
+
+    def __len__(self) -> int:
+        """Length of the macro in ticks."""
+        return max(self._timeline, default=-1) + 1
+
+    def at(self, tick: int) -> "Macro":
+        """Places the next actions on `tick`, counted from the start of the macro."""
+        self._tick = tick
+        return self
+
+    def wait(self, ticks: int) -> "Macro":
+        """Places the next actions `ticks` game ticks later."""
+        self._tick += ticks
+        return self
+
+    def add(self, kind: MacroActionKind, *args) -> "Macro":
+        self._timeline.setdefault(self._tick, []).append((kind, args))
+        return self
+
+    def key_bind(self, name: str, state: bool) -> "Macro":
+        """Presses or releases a key binding like "key.jump" (see press_key_bind)."""
+        return self.add("key_bind", name, state)
+
+    def key(self, key_name: str, state: bool) -> "Macro":
+        """Presses or releases a key by name, like "key.keyboard.w" (see Key.press_key)."""
+        return self.add("key", key_name, state)
+
+    def key_code(self, code: int, state: bool, mouse: bool = False) -> "Macro":
+        """Presses or releases a key by GLFW code, or a mouse button if `mouse` is True."""
+        return self.add("key_code", code, state, mouse)
+
+    def orientation(self, yaw: float, pitch: float) -> "Macro":
+        return self.add("orientation", yaw, pitch)
+
+    def look_at(self, x: float, y: float, z: float) -> "Macro":
+        return self.add("look_at", x, y, z)
+
+    def use(self, state: bool) -> "Macro":
+        return self.add("use", state)
+
+    def attack(self, state: bool) -> "Macro":
+        return self.add("attack", state)
+
+    def select_slot(self, slot: int) -> "Macro":
+        return self.add("select_slot", slot)
+
+    def call(self, func, *args) -> "Macro":
+        """Runs any Minescript function that supports as_task(), e.g. call(player_press_jump, True)."""
+        return self.add("call", func, *args)
+
+    def compile(self) -> list[list[Task]]:
+        """
+        Returns one list of tasks per tick, empty for ticks without actions.
+        """
+        batches: list[list[Task]] = [[] for _ in range(len(self))]
+        for tick, actions in self._timeline.items():
+            java_tasks: list[Task] = []
+            for kind, args in actions:
+                if kind in ("key", "key_code"):
+                    key = Key.get_key(args[0]) if kind == "key" else Key.get_key_from_code(args[0], args[2])
+                    tasks = Key.press_tasks(key, args[1])
+                    java_tasks.extend(tasks)
+                    batches[tick].extend(tasks)
+                else:
+                    batches[tick].append(Macro._task(kind, args))
+            if java_tasks:
+                batches[tick].append(java_release.as_task(*java_tasks))
+        return batches
+
+    @staticmethod
+    def _task(kind: MacroActionKind, args: tuple) -> Task:
+        if kind == "key_bind":
+            return press_key_bind.as_task(*args)
+        if kind == "orientation":
+            return player_set_orientation.as_task(*args)
+        if kind == "look_at":
+            return player_look_at.as_task(*args)
+        if kind == "use":
+            return player_press_use.as_task(*args)
+        if kind == "attack":
+            return player_press_attack.as_task(*args)
+        if kind == "select_slot":
+            return player_inventory_select_slot.as_task(*args)
+        if kind == "call":
+            return args[0].as_task(*args[1:])
+        raise ValueError(f"[Macro] Unknown action '{kind}'.")
+
+    def play(self) -> None:
+        """
+        Plays the macro, blocking until its last tick has run.
+        """
+        for batch in self.compile():
+            if batch:
+                with tick_loop:
+                    run_tasks(batch)
+            else:
+                TickClock.get().wait_next_tick()
+
+class MacroRecorder:
+    """
+    Records keys, mouse buttons and the player's orientation, stamped with the tick they happened on.
+
+    Example:
+        recorder = MacroRecorder()
+        recorder.start()
+        ...
+        macro = recorder.stop()
+        macro.play()
+    """
+    def __init__(self, record_orientation: bool = True) -> None:
+        self.record_orientation: bool = record_orientation
+        self._lock = threading.Lock()
+        self._actions: list[tuple[int, MacroActionKind, tuple]] = []
+        self._tick: int = 0
+        self._running: bool = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._actions = []
+        self._tick = 0
+        self._running = True
+        InputHub.get().add_raw_listener(self._on_input)
+        self._thread = threading.Thread(target=self._tick_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Macro:
+        """
+        Stops recording and returns the recorded Macro.
+        """
+        self._running = False
+        InputHub.get().remove_raw_listener(self._on_input)
+        if self._thread is not None:
+            self._thread.join()
+        macro = Macro()
+        for tick, kind, args in self._actions:
+            macro.at(tick).add(kind, *args)
+        return macro
+
+    def _on_input(self, event) -> None:
+        if not self._running or event.action not in (0, 1) or getattr(event, "screen", None):
+            return
+        if event.type == EventType.KEY:
+            args = (event.key, event.action == 1, False)
+        elif event.type == EventType.MOUSE:
+            args = (event.button, event.action == 1, True)
+        else:
+            return
+        with self._lock:
+            self._actions.append((self._tick, "key_code", args))
+
+    def _tick_loop(self) -> None:
+        last = None
+        while self._running:
+            if self.record_orientation:
+                orientation = tuple(player_orientation())
+                if orientation != last:
+                    last = orientation
+                    with self._lock:
+                        self._actions.append((self._tick, "orientation", orientation))
+            TickClock.get().wait_next_tick()
+            with self._lock:
+                self._tick += 1
+
 # # # CLIENT # # #
 
 class Client:
     @staticmethod
     def pause_game(pause_only: bool=False):
-        mc.pauseGame(pause_only)
+        _java.mc.pauseGame(pause_only)
         
     @staticmethod
     def is_local_server() -> bool:
@@ -767,7 +2442,7 @@ class Client:
         Returns:
             bool: True if it's a local server, False otherwise.
         """
-        return mc.isLocalServer() # type: ignore
+        return _java.mc.isLocalServer() # type: ignore
     
     @staticmethod
     def disconnect():
@@ -777,8 +2452,8 @@ class Client:
         This function calls the network handler's disconnect method, passing a literal text message
         to indicate that the disconnection was initiated by the user.
         """
-        mc.player.connection.getConnection().disconnect(
-            Component.literal("Disconnected by user"))
+        _java.mc.player.connection.getConnection().disconnect(
+            _java.Component.literal("Disconnected by user"))
 
     @staticmethod
     def get_options():
@@ -789,19 +2464,62 @@ class Client:
         Example: print("FOV:", Client.get_options().fov().value)
                  print("Gamma:", Client.get_options().gamma().value)
         """
-        return mc.options
+        return _java.mc.options
 
 # # # PLAYER # # #
 
+@dataclass(frozen=True)
+class PlayerStats:
+    latency: int
+    game_mode: str
+    food_level: int
+    saturation: float
+
+class _PlayerHandles:
+    def __init__(self, identity: int, player_info, food_data) -> None:
+        self.identity: int = identity   # System.identityHashCode of the LocalPlayer
+        self.player_info = player_info
+        self.food_data = food_data
+
 class Player:
+    handle_check_interval: float = 0.05  # Seconds between checks that the cached handles are still valid
+    _handles: _PlayerHandles | None = None
+    _checked_at: float = 0.0
+    _stats_members: tuple | None = None  # Method ids read by Player.stats()
+    _handles_lock = threading.Lock()
+
     @staticmethod
-    def __get_player_info(name: str):
-        return mc.player.connection.getPlayerInfo(name)
+    def __get_handles() -> _PlayerHandles:
+        """
+        Returns the cached PlayerInfo and FoodData handles of the local player.
+        They're fetched again when the LocalPlayer object changes (reconnect, respawn or dimension change).
+        """
+        with Player._handles_lock:
+            handles = Player._handles
+            now = monotonic()
+            if handles is not None and now - Player._checked_at < Player.handle_check_interval:
+                return handles
+            player = _java.mc.player
+            identity = _identity_hash(player.id)
+            if handles is None or handles.identity != identity:
+                handles = _PlayerHandles(
+                    identity, player.connection.getPlayerInfo(player_name()), player.getFoodData())
+                if handles.player_info is None:  # Not in the tab list yet, don't cache
+                    return handles
+                Player._handles = handles
+            Player._checked_at = now
+            return handles
+
+    @staticmethod
+    def invalidate() -> None:
+        """
+        Drops the cached player handles, so the next call fetches them again.
+        """
+        Player._handles = None
 
     @staticmethod
     def get_latency() -> int:
-        name = player_name()
-        return Player.__get_player_info(name).getLatency() # type: ignore
+        return Player.__get_handles().player_info.getLatency() # type: ignore
 
     @staticmethod
     def get_game_mode():
@@ -811,8 +2529,7 @@ class Player:
         Returns:
             str: The game mode of the player as a string.
         """
-        name = player_name()
-        return _get_game_mode_name(Player.__get_player_info(name).getGameMode())
+        return _get_game_mode_name(Player.__get_handles().player_info.getGameMode())
 
     @staticmethod
     def is_creative() -> bool:
@@ -822,8 +2539,7 @@ class Player:
         Returns:
             bool: True if the player is in creative mode, False otherwise.
         """
-        name = player_name()
-        return Player.__get_player_info(name).getGameMode().isCreative() # type: ignore
+        return Player.__get_handles().player_info.getGameMode().isCreative() # type: ignore
 
     @staticmethod
     def is_survival() -> bool:
@@ -833,8 +2549,7 @@ class Player:
         Returns:
             bool: True if the player is in survival mode, False otherwise.
         """
-        name = player_name()
-        return Player.__get_player_info(name).getGameMode().isSurvival() # type: ignore
+        return Player.__get_handles().player_info.getGameMode().isSurvival() # type: ignore
 
     @staticmethod
     def get_skin_url() -> str:
@@ -844,25 +2559,238 @@ class Player:
         Returns:
             str: The URL of the player's skin texture.
         """
-        name = player_name()
-        return Player.__get_player_info(name).getSkin().textureUrl() # type: ignore
+        return Player.__get_handles().player_info.getSkin().textureUrl() # type: ignore
 
     @staticmethod
     def get_food_level() -> float:
-        foodStats = mc.player.getFoodData()
+        foodStats = Player.__get_handles().food_data
         return foodStats.getFoodLevel() # type: ignore
     
     @staticmethod
     def get_saturation_level() -> float:
-        foodStats = mc.player.getFoodData()
+        foodStats = Player.__get_handles().food_data
         return foodStats.getSaturationLevel().value # type: ignore
 
+    @staticmethod
+    def stats() -> PlayerStats:
+        """
+        Retrieves the player's latency, game mode, food level and saturation in one task program.
+
+        Returns:
+            PlayerStats: The player's current stats.
+        """
+        handles = Player.__get_handles()
+        player_info = handles.player_info
+        food_data = handles.food_data
+        members = Player._stats_members
+        if members is None:
+            from lib_java import find_java_member
+            _init_mappings()
+            info_class = player_info.get_class_id()
+            food_class = food_data.get_class_id()
+            members = Player._stats_members = (
+                find_java_member(info_class, "getLatency"),
+                find_java_member(info_class, "getGameMode"),
+                find_java_member(player_info.getGameMode().get_class_id(), "method_8381" if fabric else "getName"),
+                find_java_member(food_class, "getFoodLevel"),
+                find_java_member(food_class, "getSaturationLevel"))
+        get_latency, get_game_mode, get_name, get_food_level, get_saturation = members
+        game_mode = java_call_method.as_task(player_info.id, get_game_mode)
+        values = [
+            java_call_method.as_task(player_info.id, get_latency),
+            java_call_method.as_task(game_mode, get_name),
+            java_call_method.as_task(food_data.id, get_food_level),
+            java_call_method.as_task(food_data.id, get_saturation)]
+        latency, game_mode_name, food_level, saturation = _read_batch([game_mode] + values, values)
+        return PlayerStats(
+            latency=int(latency),
+            game_mode=game_mode_name,
+            food_level=int(food_level),
+            saturation=float(saturation)
+        )
+
 # # # SERVER # # #
 
+@dataclass
+class TablistDelta:
+    joined: list[dict[str, Any]]
+    left: list[dict[str, Any]]
+    changed: list[dict[str, Any]]   # Players whose name, latency or game mode changed
+
+    def __bool__(self) -> bool:
+        return bool(self.joined or self.left or self.changed)
+
+class TablistTracker:
+    """
+    Keeps one record per tab list player and only refreshes the fields that change.
+
+    Each update reads the identity, display name, latency and game mode of every PlayerInfo in one
+    task program. A PlayerInfo whose Java identity is already known is compared with its record
+    from those values alone; only new entries are read in full. Changes are accumulated until
+    take_delta() is called, so reading the snapshot doesn't consume them.
+    """
+    _members: tuple | None = None  # Member ids read by TablistTracker.update()
+
+    def __init__(self) -> None:
+        self._records: dict[str, dict[str, Any]] = {}  # UUID string -> record
+        self._uuids: dict[int, str] = {}                # PlayerInfo identity -> UUID string
+        self._names: dict[str, str | None] = {}         # UUID string -> tab list display name text
+        self._pending: dict[str, tuple[str, dict[str, Any]]] = {}  # UUID string -> (kind, record) not yet taken
+
+    def players(self) -> list[dict[str, Any]]:
+        """
+        Returns a copy of every tracked player's record, ordered by tab list order.
+        """
+        return [TablistTracker._copy_record(r) for r in sorted(self._records.values(), key=lambda r: r["TablistOrder"])]
+
+    def update(self) -> None:
+        """
+        Reads the tab list once and records which players joined, left or changed.
+        """
+        from lib_java import JavaObject
+        pi_array = _java.mc.player.connection.getListedOnlinePlayers().toArray()
+        count = len(pi_array)
+        uuids: dict[int, str] = {}
+        for i, (identity, name_text, latency, game_mode) in enumerate(TablistTracker._read_entries(pi_array, count)):
+            uuid = self._uuids.get(identity)
+            if uuid is None:
+                player_info = JavaObject(java_array_index(pi_array.id, i))
+                display_name = player_info.getTabListDisplayName()
+                record = TablistTracker._read_record(player_info, display_name)
+                uuid = str(record["UUID"])
+                self._names[uuid] = TablistTracker._name_text(display_name)
+                self._add_pending(uuid, "changed" if uuid in self._records else "joined", record)
+                self._records[uuid] = record
+            else:
+                record = self._records[uuid]
+                changed = False
+                if name_text != self._names.get(uuid):
+                    player_info = JavaObject(java_array_index(pi_array.id, i))
+                    self._names[uuid] = name_text
+                    record["Name"] = player_info.getTabListDisplayName() if name_text else player_info.getProfile().getName()
+                    changed = True
+                if latency != record["Latency"] or game_mode != record["GameMode"]:
+                    record["Latency"] = latency
+                    record["GameMode"] = game_mode
+                    changed = True
+                if changed:
+                    self._add_pending(uuid, "changed", record)
+            uuids[identity] = uuid
+
+        present = set(uuids.values())
+        for uuid in list(self._records):
+            if uuid not in present:
+                self._names.pop(uuid, None)
+                self._add_pending(uuid, "left", self._records.pop(uuid))
+        self._uuids = uuids
+
+    @staticmethod
+    def _read_entries(pi_array, count: int) -> list[tuple[int, str | None, int, str]]:
+        """
+        Returns (identity, display name text, latency, game mode) of each PlayerInfo in `pi_array`, read in one task program.
+        """
+        if count == 0:
+            return []
+        members = TablistTracker._members
+        if members is None:
+            from lib_java import JavaObject, find_java_member, Objects_isNull_id
+            _init_mappings()
+            player_info = JavaObject(java_array_index(pi_array.id, 0))
+            info_class = player_info.get_class_id()
+            members = TablistTracker._members = (
+                find_java_member(info_class, "getTabListDisplayName"),
+                find_java_member(info_class, "getLatency"),
+                find_java_member(info_class, "getGameMode"),
+                find_java_member(player_info.getGameMode().get_class_id(), "method_8381" if fabric else "getName"),
+                Objects_isNull_id,
+                # A JDK method, looked up without the Fabric member map
+                java_member(java_class("java.lang.System"), "identityHashCode"))
+        get_display_name, get_latency, get_game_mode, get_name, is_null, identity_hash = members
+        tasks = []
+        values = []
+        for i in range(count):
+            player_info = java_array_index.as_task(pi_array.id, i)
+            display_name = java_call_method.as_task(player_info, get_display_name)
+            game_mode = java_call_method.as_task(player_info, get_game_mode)
+            entry = [
+                java_call_method.as_task(0, identity_hash, player_info),
+                java_call_method.as_task(0, is_null, display_name),
+                display_name,
+                java_call_method.as_task(player_info, get_latency),
+                java_call_method.as_task(game_mode, get_name)]
+            tasks += [player_info, game_mode] + entry
+            values += entry
+        results = _read_batch(tasks, values)
+        entries = []
+        for i in range(0, len(results), 5):
+            identity, name_is_null, name_text, latency, game_mode = results[i:i + 5]
+            entries.append((int(identity), None if name_is_null == "true" or name_text == "" else name_text,
+                            int(latency), game_mode))
+        return entries
+
+    def take_delta(self) -> TablistDelta:
+        """
+        Returns which players joined, left or changed since the previous take_delta() and forgets them.
+        """
+        delta = TablistDelta([], [], [])
+        for kind, record in self._pending.values():
+            getattr(delta, kind).append(TablistTracker._copy_record(record))
+        self._pending = {}
+        return delta
+
+    def _add_pending(self, uuid: str, kind: str, record: dict[str, Any]) -> None:
+        previous = self._pending.get(uuid)
+        if previous is not None:
+            if previous[0] == "joined":
+                if kind == "left":
+                    # Joined and left again since the last delta, nothing to report
+                    del self._pending[uuid]
+                    return
+                kind = "joined"
+            elif previous[0] == "left" and kind != "left":
+                kind = "changed"
+        self._pending[uuid] = (kind, record)
+
+    @staticmethod
+    def _name_text(display_name) -> str | None:
+        if display_name is None or display_name == "":
+            return None
+        return str(display_name)
+
+    @staticmethod
+    def _copy_record(record: dict[str, Any]) -> dict[str, Any]:
+        copy = dict(record)
+        if "Team" in copy:
+            copy["Team"] = dict(copy["Team"])
+        return copy
+
+    @staticmethod
+    def _read_record(player_info, name) -> dict[str, Any]:
+        profile = player_info.getProfile()
+        if name is None or name == "":
+            name = profile.getName()
+        record = {
+            "Name": name,
+            "UUID": profile.getId(),
+            "Latency": player_info.getLatency(),
+            "GameMode": _get_game_mode_name(player_info.getGameMode()),
+            "SkinURL": player_info.getSkin().textureUrl(),
+            "TablistOrder": player_info.getTabListOrder()
+            }
+        team = player_info.getTeam()
+        if team:
+            record["Team"] = {
+                "TeamName": team.getDisplayName(),
+                "Color": team.getColor()
+                }
+        return record
+
 class Server:
+    _tablist: TablistTracker = TablistTracker()
+
     @staticmethod
     def __get_server_data():
-        return mc.player.connection.getServerData()
+        return _java.mc.player.connection.getServerData()
 
     @staticmethod
     def is_local() -> bool:
@@ -917,9 +2845,12 @@ class Server:
         return None
     
     @staticmethod
-    def get_tablist() -> list[dict[str,Any]]:
+    def get_tablist(delta: bool = False) -> list[dict[str,Any]] | TablistDelta:
         """
         Retrieves a list of dictionaries containing information about all online players in the tab list.
+        Args:
+            delta (bool, optional): If True, returns only what changed since the previous call as a 
+                TablistDelta (joined, left and changed players). Defaults to False.
         Returns:
             list[dict[str, Any]]: A list where each dictionary represents a player and contains the following keys:
                 - "Name" (str): The display name of the player in the tab list, or their profile name if not set.
@@ -931,40 +2862,130 @@ class Server:
                 - "Team" (dict, optional): If the player is on a team, a dictionary with:
                     - "TeamName" (str): The display name of the team.
                     - "Color" (Any): The team's color.
+        Notes:
+            UUID, skin, tab list order and team are read once when a player first shows up in the
+            tab list, only the name, latency and game mode are refreshed on later calls. Use 
+            Server.reset_tablist() to read everything again. Calls with delta=False don't consume
+            the changes reported by the next call with delta=True.
         """
-        op = []
-        opi = {}
-        opt = {}
-        pi_list = mc.player.connection.getListedOnlinePlayers().toArray()
-        for i in range(len(pi_list)):
-            name = pi_list[i].getTabListDisplayName()
-            if name is None or name == "":
-                name = pi_list[i].getProfile().getName()
-            opi.update({
-                "Name": name,
-                "UUID": pi_list[i].getProfile().getId(),
-                "Latency": pi_list[i].getLatency(),
-                "GameMode": _get_game_mode_name(pi_list[i].getGameMode()),
-                "SkinURL": pi_list[i].getSkin().textureUrl(),
-                "TablistOrder": pi_list[i].getTabListOrder()
-                })
-            team = pi_list[i].getTeam()
-            if team:
-                opt.update({
-                    "TeamName": team.getDisplayName(),
-                    "Color": team.getColor()
-                    })
-                opi["Team"] = opt
-            op.append(opi)
-        
-        return op
+        Server._tablist.update()
+        if delta:
+            return Server._tablist.take_delta()
+        return Server._tablist.players()
+
+    @staticmethod
+    def reset_tablist() -> None:
+        """
+        Forgets all tracked tab list players, so the next get_tablist() reads every field again.
+        """
+        Server._tablist = TablistTracker()
 
 # # # WORLD # # #
 
+@dataclass(frozen=True)
+class WorldState:
+    raining: bool
+    thundering: bool
+    day_time: int
+    game_time: int
+    difficulty: Any     # Difficulty
+    hardcore: bool
+    fetched_at: float   # time.monotonic() when the values were read
+
 class World:
+    _sign_scanner: "SignScanner"
+    snapshot_ttl: float = 0.05  # Seconds a WorldState snapshot is reused for, one game tick by default
+    _snapshot: WorldState | None = None
+    _snapshot_lock = threading.Lock()
+
+    _level_data_members: tuple | None = None
+    _difficulties: dict[int, Any] = {}  # Difficulty ordinal -> Difficulty
+
     @staticmethod
     def __get_level_data():
-        return mc.player.connection.getLevel().getLevelData()
+        return _java.mc.player.connection.getLevel().getLevelData()
+
+    @staticmethod
+    def __read_level_data() -> list[str]:
+        """
+        Reads the WorldState fields from mc.player.connection.getLevel().getLevelData() in one task program.
+        """
+        members = World._level_data_members
+        if members is None:
+            from lib_java import find_java_class, find_java_member
+            mc = _java.mc
+            player = mc.player
+            connection = player.connection
+            level = connection.getLevel()
+            level_data = level.getLevelData()
+            data_class = level_data.get_class_id()
+            members = World._level_data_members = (
+                find_java_member(mc.get_class_id(), "player"),
+                find_java_member(player.get_class_id(), "connection"),
+                find_java_member(connection.get_class_id(), "getLevel"),
+                find_java_member(level.get_class_id(), "getLevelData"),
+                [find_java_member(data_class, name) for name in
+                 ("isRaining", "isThundering", "getDayTime", "getGameTime", "isHardcore")],
+                find_java_member(data_class, "getDifficulty"),
+                find_java_member(find_java_class("java.lang.Enum"), "ordinal"))
+        player_field, connection_field, get_level, get_level_data, getters, get_difficulty, ordinal = members
+        player = java_access_field.as_task(_java.mc.id, player_field)
+        connection = java_access_field.as_task(player, connection_field)
+        level = java_call_method.as_task(connection, get_level)
+        level_data = java_call_method.as_task(level, get_level_data)
+        difficulty = java_call_method.as_task(level_data, get_difficulty)
+        values = [java_call_method.as_task(level_data, getter) for getter in getters]
+        values.append(java_call_method.as_task(difficulty, ordinal))
+        return _read_batch([player, connection, level, level_data, difficulty] + values, values)
+
+    @staticmethod
+    def __difficulty(ordinal: int):
+        difficulty = World._difficulties.get(ordinal)
+        if difficulty is None:
+            from lib_java import JavaObject
+            values = _java.Difficulty.values()
+            difficulty = World._difficulties[ordinal] = JavaObject(java_array_index(values.id, ordinal))
+        return difficulty
+
+    @staticmethod
+    def snapshot(max_age: float | None = None) -> WorldState:
+        """
+        Returns the weather, time, difficulty and hardcore flag of the world, read together in one task program.
+
+        The snapshot is cached and reused while it's younger than `max_age` seconds, so a loop 
+        that checks the weather and the time every iteration only reads them once per tick.
+
+        Args:
+            max_age (float | None, optional): Maximum age in seconds of a cached snapshot. 
+                Defaults to None (World.snapshot_ttl). Use 0 to always read fresh values.
+
+        Returns:
+            WorldState: The world state snapshot.
+        """
+        ttl = World.snapshot_ttl if max_age is None else max_age
+        with World._snapshot_lock:
+            snap = World._snapshot
+            if snap is not None and monotonic() - snap.fetched_at < ttl:
+                return snap
+            raining, thundering, day_time, game_time, hardcore, difficulty = World.__read_level_data()
+            snap = WorldState(
+                raining=raining == "true",
+                thundering=thundering == "true",
+                day_time=int(day_time),
+                game_time=int(game_time),
+                difficulty=World.__difficulty(int(difficulty)),
+                hardcore=hardcore == "true",
+                fetched_at=monotonic()
+            )
+            World._snapshot = snap
+            return snap
+
+    @staticmethod
+    def invalidate_snapshot() -> None:
+        """
+        Drops the cached WorldState, so the next getter reads fresh values.
+        """
+        World._snapshot = None
     
     @staticmethod
     def is_raining() -> bool:
@@ -974,7 +2995,7 @@ class World:
         Returns:
             bool: True if it is raining, False otherwise.
         """
-        return World.__get_level_data().isRaining() # type: ignore
+        return World.snapshot().raining
 
     @staticmethod
     def is_thundering() -> bool:
@@ -984,7 +3005,7 @@ class World:
         Returns:
             bool: True if it is is_thundering, False otherwise.
         """
-        return World.__get_level_data().isThundering() # type: ignore
+        return World.snapshot().thundering
 
     @staticmethod
     def is_hardcore() -> bool:
@@ -994,17 +3015,17 @@ class World:
         Returns:
             bool: True if the world is hardcore, False otherwise.
         """
-        return World.__get_level_data().isHardcore() # type: ignore
+        return World.snapshot().hardcore
 
     @staticmethod
-    def get_difficulty() -> Difficulty: # type: ignore
+    def get_difficulty(): # Difficulty
         """
         Retrieves the current difficulty setting of the Minecraft world.
 
         Returns:
             Difficulty: The difficulty level of the current world.
         """
-        return World.__get_level_data().getDifficulty()
+        return World.snapshot().difficulty
 
     @staticmethod
     def get_spawn_pos(): # BlockPos
@@ -1021,14 +3042,14 @@ class World:
         """
         Returns the current game time in ticks.
         """
-        return World.__get_level_data().getGameTime() # type: ignore
+        return World.snapshot().game_time
     
     @staticmethod
     def get_day_time() -> int:
         """
         Returns the current day time in ticks.
         """
-        return World.__get_level_data().getDayTime() # type: ignore
+        return World.snapshot().day_time
    
     @staticmethod
     def get_targeted_sign_text() -> list[str]:
@@ -1039,19 +3060,199 @@ class World:
             list[str]: A list containing the text lines from the targeted sign. The first four elements are the lines from the front side, and the next four are from the back side.
         """
         position = player_get_targeted_block().position
-        pos = BlockPos(*position)
+        pos = _java.BlockPos(*position)
 
-        sign = mc.level.getBlockEntity(pos)
-        sign_text = []
-        
-        # Front
-        for i in range(0, 4):
-            sign_text.append(sign.getText(True).getMessage(i, True).tryCollapseToString())
-        # Back
-        for i in range(0, 4):
-            sign_text.append(sign.getText(False).getMessage(i, True).tryCollapseToString())
-        
-        return sign_text
+        sign = _java.mc.level.getBlockEntity(pos)
+        return World._sign_scanner.read_sign(tuple(position), sign.id)
+
+    @staticmethod
+    def scan_signs(radius: int = 32, center: tuple[float, float, float] | None = None) -> dict[tuple[int, int, int], list[str]]:
+        """
+        Retrieves the text of every sign in the loaded chunks around a position.
+
+        Args:
+            radius (int, optional): Horizontal radius in blocks around the center. Defaults to 32.
+            center (tuple[float, float, float] | None, optional): Center of the scan. Defaults to the player's position.
+
+        Returns:
+            dict[tuple[int, int, int], list[str]]: Block position -> the 8 lines of the sign, front side first,
+            like get_targeted_sign_text().
+        """
+        return World._sign_scanner.scan(radius, center)
+
+def _unpack_block_pos(packed: int) -> tuple[int, int, int]:
+    """Decodes BlockPos.asLong(): 26 bits of x, 26 bits of z, 12 bits of y."""
+    x = packed >> 38
+    z = (packed >> 12) & 0x3FFFFFF
+    y = packed & 0xFFF
+    if z >= 1 << 25:
+        z -= 1 << 26
+    if y >= 1 << 11:
+        y -= 1 << 12
+    return x, y, z
+
+class SignScanner:
+    """
+    Reads sign text from the block entities of loaded chunks, cached by block position.
+
+    Java handles are only used inside task programs. Each scanned chunk costs one program that
+    finds its signs and their positions, and one that reads the identities of their front and
+    back SignText objects. SignText objects are immutable, so only the signs that are new or
+    whose texts were replaced have their eight lines read, together in a third program.
+    """
+    _LINE_VALUES = 16  # Text and isNull of each of the 8 lines
+
+    def __init__(self) -> None:
+        self._cache: dict[tuple[int, int, int], tuple[tuple[int, int], list[str | None]]] = {}
+        self._members: dict[str, int] | None = None
+        self._line_handles: list[int] = []
+
+    def _resolve(self) -> dict[str, int]:
+        if self._members is None:
+            from lib_java import find_java_member, Class_id, Objects_isNull_id
+            sign_class = _java.SignBlockEntity
+            self._members = {
+                "sign_class": sign_class.id,
+                "isInstance": find_java_member(Class_id, "isInstance"),
+                "isNull": Objects_isNull_id,
+                "getText": find_java_member(sign_class.id, "getText"),
+                "getBlockPos": find_java_member(sign_class.id, "getBlockPos"),
+                "asLong": find_java_member(_java.BlockPos.id, "asLong"),
+                "tryCollapseToString": find_java_member(_java.Component.id, "tryCollapseToString"),
+                "identityHashCode": java_member(java_class("java.lang.System"), "identityHashCode"),
+            }
+            self._line_handles = [java_int(i) for i in range(4)]
+        return self._members
+
+    def _resolve_text(self, sign: int) -> None:
+        """Looks up SignText.getMessage from the front text of `sign`, a raw Java handle."""
+        members = self._resolve()
+        if "getMessage" not in members:
+            from lib_java import find_java_member, Object_getClass_id
+            sign_text = java_call_method(sign, members["getText"], _java_bool(True))
+            text_class = java_call_method(sign_text, Object_getClass_id)
+            members["getMessage"] = find_java_member(text_class, "getMessage")
+            java_release(sign_text, text_class)
+
+    def scan(self, radius: int = 32, center: tuple[float, float, float] | None = None) -> dict[tuple[int, int, int], list[str]]:
+        members = self._resolve()
+        if center is None:
+            center = player_position()
+        x0, z0 = center[0], center[2]
+        level = _java.mc.level
+        signs: dict[tuple[int, int, int], list[str]] = {}
+        for chunk_x in range(floor(x0 - radius) >> 4, (floor(x0 + radius) >> 4) + 1):
+            for chunk_z in range(floor(z0 - radius) >> 4, (floor(z0 + radius) >> 4) + 1):
+                if not level.hasChunk(chunk_x, chunk_z):
+                    continue
+                block_entities = level.getChunk(chunk_x, chunk_z).getBlockEntities().values().toArray()
+                count = len(block_entities)
+                if count == 0:
+                    continue
+
+                # One program finds the signs and their positions among the chunk's block entities
+                tasks, values = [], []
+                for i in range(count):
+                    handle = java_array_index.as_task(block_entities.id, i)
+                    block_pos = java_call_method.as_task(handle, members["getBlockPos"])
+                    values += [java_call_method.as_task(members["sign_class"], members["isInstance"], handle),
+                               java_call_method.as_task(block_pos, members["asLong"])]
+                    tasks += [handle, block_pos]
+                results = _read_batch(tasks + values, values)
+                found = []
+                for i in range(count):
+                    if results[2 * i] != "true":
+                        continue
+                    pos = _unpack_block_pos(int(results[2 * i + 1]))
+                    if (pos[0] + 0.5 - x0) ** 2 + (pos[2] + 0.5 - z0) ** 2 <= radius * radius:
+                        found.append((i, pos))
+                if not found:
+                    continue
+
+                # A second one reads the identities of their texts
+                if "getMessage" not in members:
+                    handle = java_array_index(block_entities.id, found[0][0])
+                    self._resolve_text(handle)
+                    java_release(handle)
+                tasks, values = [], []
+                for i, _ in found:
+                    handle = java_array_index.as_task(block_entities.id, i)
+                    tasks.append(handle)
+                    self._identity_tasks(handle, tasks, values)
+                results = _read_batch(tasks + values, values)
+                changed = []
+                for n, (i, pos) in enumerate(found):
+                    identities = (int(results[2 * n]), int(results[2 * n + 1]))
+                    cached = self._cache.get(pos)
+                    if cached is None or cached[0] != identities:
+                        changed.append((i, pos, identities))
+
+                # And a third one reads the lines of the new and changed signs only
+                if changed:
+                    tasks, values = [], []
+                    for i, _, _ in changed:
+                        handle = java_array_index.as_task(block_entities.id, i)
+                        tasks.append(handle)
+                        self._line_tasks(handle, tasks, values)
+                    results = _read_batch(tasks + values, values)
+                    for n, (_, pos, identities) in enumerate(changed):
+                        self._cache[pos] = (identities, SignScanner._lines(results, n * SignScanner._LINE_VALUES))
+                for _, pos in found:
+                    signs[pos] = list(self._cache[pos][1])  # type: ignore
+
+        # Forget cached signs inside the scanned area that are gone
+        for pos in list(self._cache):
+            if pos not in signs and (pos[0] + 0.5 - x0) ** 2 + (pos[2] + 0.5 - z0) ** 2 <= radius * radius:
+                del self._cache[pos]
+        return signs
+
+    def read_sign(self, pos: tuple[int, int, int], sign: int) -> list[str]:
+        """
+        Returns the 8 lines of the sign block entity `sign` (a raw Java handle) at `pos`, front side first.
+        The lines are only read if the sign isn't cached at `pos` or its texts were replaced.
+        """
+        self._resolve_text(sign)
+        tasks, values = [], []
+        self._identity_tasks(sign, tasks, values)
+        identities = tuple(int(value) for value in _read_batch(tasks + values, values))
+        cached = self._cache.get(pos)
+        if cached is None or cached[0] != identities:
+            tasks, values = [], []
+            self._line_tasks(sign, tasks, values)
+            cached = self._cache[pos] = (identities, SignScanner._lines(_read_batch(tasks + values, values), 0))  # type: ignore
+        return list(cached[1])  # type: ignore
+
+    def _identity_tasks(self, sign, tasks: list[Task], values: list[Task]) -> None:
+        """
+        Records the tasks reading the identity hashes of the front and back SignText of `sign` (a handle or a task).
+        """
+        members = self._members
+        for front in (True, False):
+            sign_text = java_call_method.as_task(sign, members["getText"], _java_bool(front))  # type: ignore
+            tasks.append(sign_text)
+            values.append(java_call_method.as_task(0, members["identityHashCode"], sign_text))  # type: ignore
+
+    def _line_tasks(self, sign, tasks: list[Task], values: list[Task]) -> None:
+        """
+        Records the tasks reading the 8 lines of `sign` (a handle or a task), front side first.
+        Each line adds its text and whether it's null to `values`.
+        """
+        members = self._members
+        for front in (True, False):
+            sign_text = java_call_method.as_task(sign, members["getText"], _java_bool(front))  # type: ignore
+            tasks.append(sign_text)
+            for line in self._line_handles:
+                message = java_call_method.as_task(sign_text, members["getMessage"], line, _java_bool(True))  # type: ignore
+                text = java_call_method.as_task(message, members["tryCollapseToString"])  # type: ignore
+                tasks.append(message)
+                values += [text, java_call_method.as_task(0, members["isNull"], text)]  # type: ignore
+
+    @staticmethod
+    def _lines(results: list[str], start: int) -> list[str]:
+        return [None if results[i + 1] == "true" else results[i]  # type: ignore
+                for i in range(start, start + SignScanner._LINE_VALUES, 2)]
+
+World._sign_scanner = SignScanner()  # type: ignore
 
 # # # UTIL # # #
 
@@ -1075,7 +3276,7 @@ class Util:
         Returns:
             str: The text currently stored in the clipboard.
         """
-        return mc.keyboardHandler.getClipboard() # type: ignore
+        return _java.mc.keyboardHandler.getClipboard() # type: ignore
 
     @staticmethod
     def set_clipboard(string: str):
@@ -1085,4 +3286,4 @@ class Util:
         Args:
             string (str): The text to be copied to the clipboard.
         """
-        mc.keyboardHandler.setClipboard(string)
+        _java.mc.keyboardHandler.setClipboard(string)
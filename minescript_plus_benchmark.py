@@ -0,0 +1,44 @@
+r"""
+    Startup benchmark for minescript_plus.
+
+    Measures how long `import minescript_plus` takes and what the first call of each
+    facade costs, now that Java handles are resolved lazily on first use.
+    Run it in game, on an old and a new version, to compare import times.
+
+    Usage: \minescript_plus_benchmark [runs]
+"""
+import sys
+import time
+from minescript import echo
+
+def _ms(start: float) -> str:
+    return f"{(time.perf_counter() - start) * 1000:.1f} ms"
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+start = time.perf_counter()
+import minescript_plus
+echo(f"import minescript_plus: {_ms(start)}")
+
+# Re-imports only measure the module body, not the one-time import of minescript/lib_java
+for _ in range(runs - 1):
+    del sys.modules["minescript_plus"]
+    start = time.perf_counter()
+    import minescript_plus
+    echo(f"re-import minescript_plus: {_ms(start)}")
+
+first_use = {
+    "Client": lambda: minescript_plus.Client.is_local_server(),
+    "World": lambda: minescript_plus.World.get_day_time(),
+    "Player": lambda: minescript_plus.Player.get_food_level(),
+    "Server": lambda: minescript_plus.Server.is_local(),
+    "Key": lambda: minescript_plus.Key.press_key("key.keyboard.unknown", False),
+    "Util": lambda: minescript_plus.Util.get_clipboard(),
+}
+for name, call in first_use.items():
+    start = time.perf_counter()
+    try:
+        call()
+        echo(f"first {name} call: {_ms(start)}")
+    except Exception as e:
+        echo(f"first {name} call failed: {e}")
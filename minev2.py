@@ -1,23 +1,33 @@
 import minescript as m
 import sys
-import time
 import lib_turn_w_direction
 import test
+from minescript_plus import RateGovernor, CancelToken
 lib_turn_w_direction.turn_w_dir("W")
 direction = ["key.right","key.left"]
 x = 0
+governor = RateGovernor.get()
+governor.limit("check", per_tick=1) # the targeted block only changes once per tick
 m.press_key_bind("key.attack",True)
-while True:
-    if (m.player_get_targeted_block(4)==None):
-        m.press_key_bind(direction[x%2],True)
-        time.sleep(0.2)
-        m.press_key_bind(direction[x%2],False)
-        x+=1
-    if(test.test()):
-        m.press_key_bind("key.attack",True)
-        print("ended")
-        break
-        # print("ended")
+token = CancelToken().cancel_on_chat("stop") # type "stop" in chat to stop mining
+def release_keys():
+    for key in ["key.attack"] + direction:
+        m.press_key_bind(key,False)
+token.on_cancel(release_keys)
+with token:
+    while True:
+        governor.acquire("check")
+        token.raise_if_cancelled()
+        if (m.player_get_targeted_block(4)==None):
+            m.press_key_bind(direction[x%2],True)
+            token.wait_ticks(4)
+            m.press_key_bind(direction[x%2],False)
+            x+=1
+        if(test.test()):
+            m.press_key_bind("key.attack",True)
+            print("ended")
+            break
+            # print("ended")
 
 
 
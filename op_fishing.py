@@ -1,27 +1,15 @@
 import minescript as m
 import time
-from threading import Thread
+from minescript_plus import CancelToken
 
-stop_flag = False
 yaw_angle = 0.0
 catch_counts = {}
 triggered = False
 start_time = time.time()
 
-def listen_chat():
-    global stop_flag
-    with m.EventQueue() as eq:
-        eq.register_chat_listener()
-        while True:
-            event = eq.get()
-            if event.type == m.EventType.CHAT:
-                msg = event.message.lower()
-                if "stop" in msg:
-                    m.echo("Stop command received. Stopping auto fishing.")
-                    stop_flag = True
-                    break
-
-Thread(target=listen_chat, daemon=True).start()
+# Typing "stop" in chat stops the script, even in the middle of a wait
+token = CancelToken().cancel_on_chat("stop")
+token.on_cancel(lambda: m.echo("Stop command received. Stopping auto fishing."))
 
 def give_best_rod():
     m.execute('/item replace entity @p hotbar.0 with minecraft:fishing_rod')
@@ -54,15 +42,13 @@ def wait_for_bite(bobber, timeout=30):
     start = time.time()
     last_y = bobber.position[1]
     while time.time() - start < timeout:
-        if stop_flag:
-            return False
         entity = find_bobber()
         if entity:
             y = entity.position[1]
             if y - last_y > 0.2:
                 return True
             last_y = y
-        time.sleep(0.1)
+        token.sleep(0.1)
     return False
 
 def snapshot_inventory():
@@ -108,9 +94,9 @@ def handle_inventory_full():
 
         # Open chat and display summary
         m.show_chat_screen(True, "")
-        time.sleep(0.5)
+        token.sleep(0.5)
         print_catch_summary()
-        time.sleep(1)
+        token.sleep(1)
 
         # Take a screenshot
         timestamp = time.strftime("%Y%m%d_%H%M%S")
@@ -121,7 +107,7 @@ def handle_inventory_full():
         # Save summary to text file
         save_summary_to_file()
 
-        time.sleep(2)
+        token.sleep(2)
         m.show_chat_screen(False)
 
         # Clear inventory
@@ -140,35 +126,36 @@ m.echo("Auto fishing started.")
 m.echo(f"Start Time: {lap_time()}")
 
 # Main loop
-while not stop_flag:
-    rotate_view()
-    handle_inventory_full()
+with token:
+    while True:
+        rotate_view()
+        handle_inventory_full()
 
-    before = snapshot_inventory()
+        before = snapshot_inventory()
 
-    m.player_press_use(True)
-    m.player_press_use(False)
-    time.sleep(2)
-
-    bobber = find_bobber()
-    if bobber and wait_for_bite(bobber):
         m.player_press_use(True)
         m.player_press_use(False)
-        time.sleep(1)
-
-        after = snapshot_inventory()
-        item_name = detect_catch(before, after)
-
-        if item_name:
-            catch_counts[item_name] = catch_counts.get(item_name, 0) + 1
-            m.echo(f"Caught: {item_name}  (Total: {catch_counts[item_name]})")
-            m.echo(f"Lap Time: {lap_time()}")
+        token.sleep(2)
+
+        bobber = find_bobber()
+        if bobber and wait_for_bite(bobber):
+            m.player_press_use(True)
+            m.player_press_use(False)
+            token.sleep(1)
+
+            after = snapshot_inventory()
+            item_name = detect_catch(before, after)
+
+            if item_name:
+                catch_counts[item_name] = catch_counts.get(item_name, 0) + 1
+                m.echo(f"Caught: {item_name}  (Total: {catch_counts[item_name]})")
+                m.echo(f"Lap Time: {lap_time()}")
+            else:
+                m.echo("Fish caught, but item not detected.")
         else:
-            m.echo("Fish caught, but item not detected.")
-    else:
-        m.echo("No bite.")
+            m.echo("No bite.")
 
-    time.sleep(1)
+        token.sleep(1)
 
 # Final process
 m.echo("Auto fishing stopped.")
@@ -2,6 +2,7 @@ import minescript as m
 import sys
 import time
 import system.lib.minescript
+from minescript_plus import RateGovernor
 
 # m.chat("abc")
 # m.player_press_forward(True)
@@ -14,10 +15,14 @@ import system.lib.minescript
 #     m.player_set_orientation(a,0)
 # a = 0
 
+governor = RateGovernor.get()
+governor.limit("orientation", per_tick=1) # the game applies one rotation per tick
+
 a = 0
 nr_of_spins = int(sys.argv[1]) * 360
 speed = int(sys.argv[2])
 while(a<nr_of_spins):
     a+=speed
 
+    governor.acquire("orientation")
     m.player_set_orientation(a,0)
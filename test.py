@@ -11,7 +11,7 @@ def test():
     NETHERITE_PICKAXE = 230
     DIAMOND = 1530
     # print(m.player_hand_items().main_hand)
-    if (lib_nbt.parse_snbt(m.player_hand_items().main_hand['nbt'])['components']['minecraft:damage']>DIAMOND):
+    if (lib_nbt.get_path(m.player_hand_items().main_hand['nbt'], "components.minecraft:damage", 0)>DIAMOND):
         return 1
     else:
         return 0
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The libraries live at the top of the repo, next to the scripts that use them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,139 @@
+"""A minimal in-process stand-in for the Minescript Java API, for testing minescript_plus offline.
+
+Java objects are Python objects kept in a handle table. Methods are looked up by class and
+member name, so a member that doesn't exist on a class fails the way it does in the game.
+lib_java is replaced too, with a `java_member_map` like the one minescript_plus fills on Fabric.
+"""
+
+import sys
+import types
+from unittest import mock
+
+class Task:
+  def __init__(self, func, args):
+    self.func = func
+    self.args = args
+
+class _Function:
+  def __init__(self, func):
+    self.func = func
+
+  def __call__(self, *args):
+    return self.func(*args)
+
+  def as_task(self, *args):
+    return Task(self, args)
+
+def _java_text(value):
+  if value is None:
+    return "null"
+  if value is True or value is False:
+    return "true" if value else "false"
+  return str(value)
+
+class AtomicReference:
+  def __init__(self):
+    self.value = None
+
+  def __str__(self):
+    return _java_text(self.value)
+
+# Class name -> member name -> implementation taking (target, *args)
+MEMBERS = {
+  "java.util.concurrent.atomic.AtomicReference": {
+    "set": lambda ref, value: setattr(ref, "value", value),
+    "get": lambda ref: ref.value,
+  },
+  "java.util.Objects": {
+    "toString": lambda _, value: _java_text(value),
+    "isNull": lambda _, value: value is None,
+  },
+  "java.lang.String": {
+    "length": lambda text: len(text.encode("utf-16-le", "surrogatepass")) // 2,
+    "concat": lambda text, other: text + other,
+  },
+}
+CONSTRUCTORS = {"java.util.concurrent.atomic.AtomicReference": AtomicReference}
+
+class FakeJvm:
+  def __init__(self):
+    self.objects = {}
+    self.members = {name: dict(members) for name, members in MEMBERS.items()}
+    self._next = 1
+
+  def new_handle(self, value):
+    handle = self._next
+    self._next += 1
+    self.objects[handle] = value
+    return handle
+
+  def value(self, handle):
+    return None if handle == 0 else self.objects[handle]
+
+  def java_class(self, name):
+    if name not in self.members:
+      raise ValueError(f"No class {name}")
+    return self.new_handle(("class", name))
+
+  def java_member(self, class_handle, name):
+    _, class_name = self.value(class_handle)
+    member = self.members[class_name].get(name)
+    if member is None:
+      raise ValueError(f"No member {name} in {class_name}")
+    return self.new_handle(("member", member))
+
+  def java_ctor(self, class_handle):
+    return self.new_handle(("ctor", CONSTRUCTORS[self.value(class_handle)[1]]))
+
+  def java_new_instance(self, ctor_handle, *args):
+    return self.new_handle(self.value(ctor_handle)[1](*map(self.value, args)))
+
+  def java_call_method(self, target, method, *args):
+    _, func = self.value(method)
+    return self.new_handle(func(self.value(target), *map(self.value, args)))
+
+  def java_string(self, text):
+    return self.new_handle(text)
+
+  def java_int(self, value):
+    return self.new_handle(value)
+
+  def java_bool(self, value):
+    return self.new_handle(bool(value))
+
+  def java_to_string(self, handle):
+    return _java_text(self.value(handle))
+
+  def java_release(self, *handles):
+    for handle in handles:
+      self.objects.pop(handle, None)
+
+  def run_tasks(self, tasks):
+    results = {}
+    result = None
+    for task in tasks:
+      args = [results[id(arg)] if isinstance(arg, Task) else arg for arg in task.args]
+      result = results[id(task)] = task.func(*args)
+    return result
+
+_JVM_FUNCTIONS = (
+  "java_class", "java_member", "java_ctor", "java_new_instance", "java_call_method", "java_string",
+  "java_int", "java_bool", "java_to_string", "java_release", "run_tasks")
+
+def install(jvm: FakeJvm, member_map=None):
+  """Returns a patch of sys.modules with fake `minescript` and `lib_java` modules backed by `jvm`.
+
+  Modules imported while the patch is active, such as minescript_plus, are dropped when it stops.
+  """
+  minescript = types.ModuleType("minescript")
+  minescript.__getattr__ = lambda name: mock.MagicMock(name=name)
+  minescript.Task = Task
+  for name in _JVM_FUNCTIONS:
+    setattr(minescript, name, _Function(getattr(jvm, name)))
+
+  lib_java = types.ModuleType("lib_java")
+  lib_java.java_class_map = {}
+  lib_java.java_member_map = {} if member_map is None else member_map
+  lib_java.find_java_class = lambda name: jvm.java_class(lib_java.java_class_map.get(name, name))
+  lib_java.find_java_member = lambda clss, name: jvm.java_member(clss, lib_java.java_member_map.get(name, name))
+  return mock.patch.dict(sys.modules, {"minescript": minescript, "lib_java": lib_java})
@@ -0,0 +1,71 @@
+import unittest
+
+import lib_nbt
+from lib_nbt import Byte, Float, Long, Short
+
+class ParseSnbtTest(unittest.TestCase):
+
+  def test_values(self):
+    self.assertEqual(
+        lib_nbt.parse_snbt('{a:1b,b:2.5f,c:"x y",d:[1,2],e:{},f:true,g:stone}'),
+        {"a": 1, "b": 2.5, "c": "x y", "d": [1, 2], "e": {}, "f": True, "g": "stone"})
+
+  def test_empty_string(self):
+    self.assertIsNone(lib_nbt.parse_snbt(""))
+
+  def test_whitespace_around_tokens(self):
+    self.assertEqual(lib_nbt.parse_snbt("{a : 1}"), {"a": 1})
+    self.assertEqual(lib_nbt.parse_snbt(" { a : 1 , b : [ 2 , 3 ] } "), {"a": 1, "b": [2, 3]})
+
+  def test_escapes(self):
+    self.assertEqual(lib_nbt.parse_snbt(r'{a:"q\"z",b:' + r"'it\'s'}"), {"a": 'q"z', "b": "it's"})
+
+  def test_errors(self):
+    for snbt in ["{a:1", "[1,]", "{a 1}", "{a:1}x", '{a:"x}']:
+      with self.subTest(snbt=snbt):
+        with self.assertRaises(ValueError):
+          lib_nbt.parse_snbt(snbt)
+
+  def test_doubles_keep_a_decimal_point(self):
+    cases = {1.0: "1.0", 2.5: "2.5", 1e16: "1.0e16", -1e300: "-1.0e300", 1.5e-07: "1.5e-07", 1e-300: "1.0e-300"}
+    for value, snbt in cases.items():
+      with self.subTest(value=value):
+        self.assertEqual(lib_nbt.to_snbt(value), snbt)
+        self.assertEqual(lib_nbt.to_snbt(Float(value)), snbt + "f")
+        self.assertEqual(lib_nbt.parse_snbt(snbt), value)
+    self.assertEqual(lib_nbt.to_snbt({"a": 1e300}), "{a:1.0e300}")
+
+class BinaryNbtTest(unittest.TestCase):
+
+  VALUE = {"b": Byte(-1), "s": Short(300), "i": 7, "l": Long(-5), "f": Float(0.5), "d": 2.25,
+           "str": "caf\u00e9", "list": [{"a": "x"}, {}], "empty": [], "nested": {"ints": [1, 2]}}
+
+  def test_round_trip(self):
+    for compression in (None, "gzip", "zlib"):
+      with self.subTest(compression=compression):
+        data = lib_nbt.to_nbt(self.VALUE, "root", compression)
+        value = lib_nbt.parse_nbt(data, typed=True)
+        self.assertEqual(value, self.VALUE)
+        self.assertEqual({k: type(v) for k, v in value.items()}, {k: type(v) for k, v in self.VALUE.items()})
+
+  def test_int_list_takes_widest_tag(self):
+    data = lib_nbt.to_nbt({"x": [Long(1), Long(2 ** 40)]})
+    plain = lib_nbt.parse_nbt(data)
+    self.assertEqual(lib_nbt.to_nbt(plain), data)
+    self.assertEqual(lib_nbt.to_nbt({"x": [1, 2 ** 40]}), data)
+    self.assertEqual(lib_nbt.to_snbt(plain), "{x:[1L,1099511627776L]}")
+    self.assertEqual(lib_nbt.to_snbt([1, 2]), "[1,2]")
+
+  def test_mixed_list(self):
+    with self.assertRaises(ValueError):
+      lib_nbt.to_nbt({"x": [1, "a"]})
+
+  def test_truncated(self):
+    data = lib_nbt.to_nbt(self.VALUE)
+    for size in (0, 1, 5, len(data) // 2, len(data) - 1):
+      with self.subTest(size=size):
+        with self.assertRaises(ValueError):
+          lib_nbt.parse_nbt(data[:size])
+
+if __name__ == "__main__":
+  unittest.main()
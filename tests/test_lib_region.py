@@ -0,0 +1,164 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import lib_nbt
+import lib_region
+from lib_nbt import Byte, Long
+
+CHUNK = {
+    "DataVersion": 3953,
+    "xPos": 1,
+    "zPos": -2,
+    "Status": "minecraft:full",
+    "InhabitedTime": Long(1234),
+    "isLightOn": Byte(1),
+    "Heights": [Long(1), Long(2 ** 40)],
+    "sections": [{"Y": Byte(-4), "block_states": {"palette": [{"Name": "minecraft:stone"}]}}],
+}
+
+class RegionFileTest(unittest.TestCase):
+
+  def setUp(self):
+    self._dir = tempfile.TemporaryDirectory()
+    self.addCleanup(self._dir.cleanup)
+
+  def _path(self, name="r.0.-1.mca"):
+    return os.path.join(self._dir.name, name)
+
+  def test_round_trip(self):
+    for compression in (lib_region.COMPRESSION_GZIP, lib_region.COMPRESSION_ZLIB, lib_region.COMPRESSION_NONE):
+      with self.subTest(compression=compression):
+        path = self._path()
+        lib_region.write_region_file(path, {(1, 30): CHUNK, (0, 0): {"x": 1}}, compression, timestamp=42)
+        with lib_region.RegionFile(path) as region:
+          self.assertEqual(sorted(region.chunks()), [(0, -32), (1, -2)])
+          self.assertEqual(region.chunk_count(), 2)
+          self.assertEqual(region.timestamp(1, 30), 42)
+          self.assertFalse(region.has_chunk(5, 5))
+          self.assertIsNone(region.read_chunk(5, 5))
+          chunk = region.read_chunk(1, 30, typed=True)
+        self.assertEqual(chunk, CHUNK)
+        self.assertIs(type(chunk["InhabitedTime"]), Long)
+        self.assertEqual(lib_nbt.to_nbt(chunk), lib_nbt.to_nbt(CHUNK))
+
+  def test_empty_region_file(self):
+    path = self._path()
+    open(path, "wb").close()
+    with lib_region.RegionFile(path) as region:
+      self.assertEqual(list(region.chunks()), [])
+      self.assertEqual(region.chunk_count(), 0)
+      self.assertEqual(region.timestamp(0, 0), 0)
+      self.assertIsNone(region.read_chunk(0, 0))
+
+  def test_truncated_chunk(self):
+    path = self._path()
+    lib_region.write_region_file(path, {(0, 0): CHUNK}, lib_region.COMPRESSION_NONE)
+    with open(path, "r+b") as f:
+      f.truncate(2 * lib_region.SECTOR_SIZE + 100)
+    with lib_region.RegionFile(path) as region:
+      with self.assertRaises(ValueError):
+        region.read_chunk(0, 0)
+
+  def test_chunk_outside_file(self):
+    path = self._path()
+    lib_region.write_region_file(path, {(0, 0): CHUNK})
+    with open(path, "r+b") as f:
+      f.truncate(2 * lib_region.SECTOR_SIZE)
+    with lib_region.RegionFile(path) as region:
+      with self.assertRaises(ValueError):
+        region.read_chunk(0, 0)
+
+def _signed(word):
+  return word - (1 << 64) if word >= 1 << 63 else word
+
+def _pack_compact(indices, bits):
+  per_long = 64 // bits
+  return [_signed(sum(index << (j * bits) for j, index in enumerate(indices[i:i + per_long])))
+          for i in range(0, len(indices), per_long)]
+
+def _pack_spanning(indices, bits):
+  packed = sum(index << (i * bits) for i, index in enumerate(indices))
+  return [_signed(packed >> (64 * i) & (1 << 64) - 1) for i in range(len(indices) * bits // 64)]
+
+class DecodeSectionTest(unittest.TestCase):
+
+  def _check(self, section, data_version, expected):
+    decoders = [False, True] if lib_region.numpy is not None else [False]
+    for use_numpy in decoders:
+      numpy = lib_region.numpy if use_numpy else None
+      with self.subTest(numpy=use_numpy), mock.patch.object(lib_region, "numpy", numpy):
+        _, indices = lib_region.decode_section(section, data_version)
+        self.assertEqual(list(indices), expected)
+
+  def test_packings(self):
+    rng = random.Random(1)
+    for size in (2, 17, 33, 300):
+      bits = max(4, (size - 1).bit_length())
+      expected = [rng.randrange(size) for _ in range(4096)]
+      palette = [{"Name": f"minecraft:block_{i}"} for i in range(size)]
+      with self.subTest(bits=bits):
+        self._check({"block_states": {"palette": palette, "data": _pack_compact(expected, bits)}}, 3953, expected)
+        self._check({"Palette": palette, "BlockStates": _pack_spanning(expected, bits)}, 1976, expected)
+
+  def test_spanning_data_needs_data_version(self):
+    palette = [{"Name": f"minecraft:block_{i}"} for i in range(17)]
+    section = {"Palette": palette, "BlockStates": _pack_spanning([0] * 4096, 5)}
+    with self.assertRaises(ValueError):
+      lib_region.decode_section(section)
+
+  def test_count_blocks_reads_data_version(self):
+    palette = [{"Name": f"minecraft:block_{i}"} for i in range(17)]
+    indices = [i % 17 for i in range(4096)]
+    section = {"Palette": palette, "BlockStates": _pack_spanning(indices, 5)}
+    chunk = {"DataVersion": 1976, "Level": {"Sections": [section]}}
+    counts = lib_region.count_blocks(chunk)
+    self.assertEqual(counts["minecraft:block_0"], indices.count(0))
+    self.assertEqual(sum(counts.values()), 4096)
+
+class ScanRegionsTest(unittest.TestCase):
+
+  def test_corrupt_chunk_is_reported_and_scan_goes_on(self):
+    with tempfile.TemporaryDirectory() as directory:
+      ore = {"sections": [{"Y": Byte(0), "block_states": {"palette": [{"Name": "minecraft:diamond_ore"}]}}]}
+      good = os.path.join(directory, "r.0.0.mca")
+      mixed = os.path.join(directory, "r.1.0.mca")
+      missing = os.path.join(directory, "r.2.0.mca")
+      lib_region.write_region_file(good, {(0, 0): ore})
+      # The chunk at (1, 0) is a truncated compound that still mentions the block
+      lib_region.write_region_file(
+          mixed, {(0, 0): lib_nbt.to_nbt(ore), (1, 0): b"\x0a\x00\x00\x08minecraft:diamond_ore"},
+          lib_region.COMPRESSION_NONE)
+      checkpoint = os.path.join(directory, "checkpoint.json")
+      for workers in (0, 1):
+        with self.subTest(workers=workers):
+          if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+          errors = []
+          def on_error(path, e):
+            errors.append((path, (e.x, e.z) if isinstance(e, lib_region.ChunkError) else type(e)))
+          matches = list(lib_region.scan_regions([mixed, missing, good], ["diamond_ore"], workers,
+                                                 checkpoint, on_error))
+          self.assertEqual(len(matches), 2 * 16 * 16 * 16)
+          self.assertEqual({match.region for match in matches}, {good, mixed})
+          self.assertEqual(sorted(errors, key=str), [(mixed, (33, 0)), (missing, FileNotFoundError)])
+          with open(checkpoint) as f:
+            self.assertEqual(json.load(f)["scanned"], sorted([os.path.abspath(good), os.path.abspath(mixed)]))
+
+  def test_regions_are_split_into_batches(self):
+    with tempfile.TemporaryDirectory() as directory:
+      sections = [{"Y": Byte(0), "block_states": {"palette": [{"Name": "minecraft:diamond_ore"}]}}]
+      path = os.path.join(directory, "r.0.0.mca")
+      lib_region.write_region_file(path, {(x, 0): {"xPos": x, "zPos": 0, "sections": sections} for x in range(5)})
+      checkpoint = os.path.join(directory, "checkpoint.json")
+      with mock.patch.object(lib_region, "CHUNKS_PER_TASK", 2):
+        matches = list(lib_region.scan_regions([path], ["diamond_ore"], 0, checkpoint))
+      self.assertEqual({match.x // 16 for match in matches}, set(range(5)))
+      with open(checkpoint) as f:
+        self.assertEqual(json.load(f)["scanned"], [os.path.abspath(path)])
+
+if __name__ == "__main__":
+  unittest.main()
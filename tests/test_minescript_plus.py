@@ -0,0 +1,169 @@
+import importlib
+import threading
+import unittest
+from unittest import mock
+
+import fake_minescript
+
+class ReadBatchTest(unittest.TestCase):
+
+  def setUp(self):
+    self.jvm = fake_minescript.FakeJvm()
+    self.values = {}
+    self.jvm.members["test.Values"] = {"get": lambda _, key: self.values[key]}
+    # Fabric's member map holds Minecraft names that JDK classes don't have
+    patch = fake_minescript.install(self.jvm, {"set": "method_1416", "get": "method_1234"})
+    patch.start()
+    self.addCleanup(patch.stop)
+    self.mp = importlib.import_module("minescript_plus")
+
+  def _read(self, *values):
+    get = self.jvm.java_member(self.jvm.java_class("test.Values"), "get")
+    tasks = []
+    for i, value in enumerate(values):
+      self.values[i] = value
+      tasks.append(self.mp.java_call_method.as_task(0, get, self.jvm.java_int(i)))
+    return self.mp._read_batch(tasks, tasks)
+
+  def test_values(self):
+    self.assertEqual(self._read(True, 42, None, 2.5), ["true", "42", "null", "2.5"])
+
+  def test_strings_with_any_character(self):
+    values = ["", "a:b", "1:x", "sep\x1fline", "café \U0001F600", "\n"]
+    self.assertEqual(self._read(*values), values)
+
+  def test_no_values(self):
+    self.assertEqual(self.mp._read_batch([], []), [])
+
+  def test_handles_are_released(self):
+    self._read(1, "x")
+    count = len(self.jvm.objects)
+    self._read(1, "x")
+    self.assertEqual(len(self.jvm.objects), count + 4)  # Only the new Values class, member and java_int args
+
+class CancelTokenTest(unittest.TestCase):
+
+  def setUp(self):
+    patch = fake_minescript.install(fake_minescript.FakeJvm())
+    patch.start()
+    self.addCleanup(patch.stop)
+    self.mp = importlib.import_module("minescript_plus")
+
+  def test_hooks_run_on_cancel(self):
+    calls = []
+    with self.mp.CancelToken() as token:
+      token.on_cancel(lambda: calls.append(1))
+      token.on_cancel(lambda: calls.append(2))
+      token.cancel()
+      token.raise_if_cancelled()
+    self.assertEqual(calls, [2, 1])
+    token.on_cancel(lambda: calls.append(3))  # Added after cleanup
+    self.assertEqual(calls, [2, 1, 3])
+
+  def test_hooks_run_on_error(self):
+    calls = []
+    with self.assertRaises(KeyError):
+      with self.mp.CancelToken() as token:
+        token.on_cancel(lambda: calls.append(1))
+        raise KeyError()
+    self.assertEqual(calls, [1])
+
+  def test_hooks_skipped_on_normal_exit(self):
+    calls = []
+    for _ in range(2):
+      with self.mp.CancelToken() as token:
+        token.on_cancel(lambda: calls.append(1))
+        token._on_exit(lambda: calls.append("exit"))
+        break
+    self.assertEqual(calls, ["exit"])
+    token.on_cancel(lambda: calls.append(2))
+    self.assertEqual(calls, ["exit"])
+
+class InputHubTest(unittest.TestCase):
+
+  PRESS, RELEASE, REPEAT = 1, 0, 2
+
+  def setUp(self):
+    patch = fake_minescript.install(fake_minescript.FakeJvm())
+    patch.start()
+    self.addCleanup(patch.stop)
+    self.mp = importlib.import_module("minescript_plus")
+    self.now = 0.0
+    for target, name, value in [(self.mp.InputHub, "_key_listener_loop", lambda hub: None),
+                                (self.mp, "monotonic", lambda: self.now)]:
+      patcher = mock.patch.object(target, name, value)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    self.hub = self.mp.InputHub(max_workers=2)
+    self.calls = []
+
+  def _keys(self, *events):
+    for key, action in events:
+      self.hub._on_key(key, action)
+    self.hub._pool.shutdown(wait=True)
+
+  def test_key_fires_on_release_or_press(self):
+    self.hub.bind_key(65, lambda: self.calls.append("release"))
+    self.hub.bind_key(65, lambda: self.calls.append("press"), trigger="press")
+    self._keys((65, self.PRESS), (66, self.PRESS), (65, self.RELEASE))
+    self.assertEqual(sorted(self.calls), ["press", "release"])
+
+  def test_chord_fires_once_per_hold(self):
+    self.hub.bind_chord([341, 75], lambda: self.calls.append("chord"))
+    self._keys((341, self.PRESS), (75, self.PRESS), (75, self.REPEAT), (75, self.RELEASE),
+               (75, self.PRESS), (75, self.RELEASE), (341, self.RELEASE), (75, self.PRESS))
+    self.assertEqual(self.calls, ["chord", "chord"])
+
+  def test_sequence_times_out(self):
+    binding = self.mp.InputBinding("sequence", (1, 2, 3), lambda: None, "press", timeout=1.0)
+    down = set()
+    self.assertEqual([binding._feed(key, self.PRESS, down, now) for key, now in [(1, 0.0), (2, 0.5), (3, 0.9)]],
+                     [False, False, True])
+    self.assertEqual([binding._feed(key, self.PRESS, down, now) for key, now in [(1, 2.0), (2, 3.5), (3, 3.6)]],
+                     [False, False, False])
+    self.assertFalse(binding._feed(1, self.REPEAT, down, 3.7))
+    self.assertEqual([binding._feed(key, self.PRESS, down, now) for key, now in [(1, 3.8), (2, 3.9), (3, 4.0)]],
+                     [False, False, True])
+
+  def test_debounce(self):
+    self.hub.bind_key(65, lambda: self.calls.append(self.now), trigger="press", debounce=0.5)
+    for self.now in (0.0, 0.2, 0.6):
+      self.hub._on_key(65, self.PRESS)
+    self._keys()
+    self.assertEqual(self.calls, [0.0, 0.6])
+
+  def test_coalesce_runs_once_more(self):
+    started = threading.Event()
+    resume = threading.Event()
+    def callback():
+      self.calls.append(1)
+      started.set()
+      resume.wait(5)
+    self.hub.bind_key(65, callback, trigger="press")
+    self.hub._on_key(65, self.PRESS)
+    self.assertTrue(started.wait(5))
+    for _ in range(3):
+      self.hub._on_key(65, self.PRESS)  # Collapse into one rerun while the callback runs
+    resume.set()
+    self._keys()
+    self.assertEqual(self.calls, [1, 1])
+
+  def test_unbind(self):
+    binding = self.hub.bind_key(65, lambda: self.calls.append(1), trigger="press")
+    self.hub.unbind(binding)
+    self._keys((65, self.PRESS))
+    self.assertEqual(self.calls, [])
+
+  def test_raw_listeners_added_while_dispatching(self):
+    def first(event):
+      self.calls.append(("first", event))
+      self.hub.add_raw_listener(lambda event: self.calls.append(("second", event)))
+    self.hub.add_raw_listener(first)
+    self.hub._on_raw_event("a")
+    self.assertEqual(self.calls, [("first", "a")])
+    self.hub.remove_raw_listener(first)
+    self.hub._on_raw_event("b")
+    self.assertEqual(self.calls, [("first", "a"), ("second", "b")])
+
+if __name__ == "__main__":
+  unittest.main()